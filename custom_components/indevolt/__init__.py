@@ -6,10 +6,14 @@ import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
 from homeassistant.exceptions import ConfigEntryNotReady
-from .const import DOMAIN, PLATFORMS
-from .coordinator import IndevoltCoordinator
+from homeassistant.helpers.storage import Store
+from .const import DATA_HUB, DOMAIN, PLATFORMS, STORAGE_VERSION
+from .coordinator import IndevoltCoordinator, storage_key
+from .hub import IndevoltHub
+from .indevolt_api import IndevoltAPIError
+from .register_map import async_get_models, async_get_register_map
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -17,8 +21,20 @@ async def async_setup(hass: HomeAssistant, config: dict[str, Any]) -> bool:
     """
     Set up the indevolt integration component.
     This function is called when the integration is added to the Home Assistant configuration.
-    No component-level setup needed.
+    It registers the service returning the poll traces of all devices.
     """
+
+    async def dump_trace(call: ServiceCall) -> ServiceResponse:
+        """Return the recorded poll timings of every device, oldest first."""
+        return {
+            entry_id: {
+                "name": coordinator.name,
+                "traces": [trace.as_dict() for trace in coordinator.traces],
+            }
+            for entry_id, coordinator in hass.data.get(DOMAIN, {}).items()
+        }
+
+    hass.services.async_register(DOMAIN, "dump_trace", dump_trace, supports_response=SupportsResponse.ONLY)
     return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -26,25 +42,55 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     Set up indevolt from a config entry.
     This is the main setup function called when a config entry is added.
     It initializes the coordinator and sets up platforms.
+    Startup does not wait for a full poll: entities start from the values
+    saved by the previous run and the first poll runs in the background.
+    Only a single short probe request has to answer.
     """
     hass.data.setdefault(DOMAIN, {})
+    # One hub schedules the polls of all devices.
+    if DATA_HUB not in hass.data:
+        hass.data[DATA_HUB] = IndevoltHub(hass)
+    hub = hass.data[DATA_HUB]
+    coordinator = None
     
     try:
-        coordinator = IndevoltCoordinator(hass, entry.data)
-        # Perform initial data refresh.
-        await coordinator.async_config_entry_first_refresh()
+        gen = entry.data.get("device_gen")
+        if gen is None:
+            # Entries set up before generation detection only store the model.
+            models = await async_get_models(hass)
+            gen = models.get(entry.data["device_model"], max(models.values()))
+        register_map = await async_get_register_map(
+            hass, gen, entry.data.get("device_model"), entry.data.get("fw_version")
+        )
+        coordinator = IndevoltCoordinator(hass, entry.data, register_map, hub)
+        # Check that the device answers, then restore the last known values.
+        await coordinator.api.probe()
+        await coordinator.async_restore()
         # Store coordinator in hass.data for platform access.
         hass.data[DOMAIN][entry.entry_id] = coordinator
         # Set up all platforms (sensors, switches, etc.).
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+        # Perform the initial data refresh without holding up startup.
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} first refresh {entry.entry_id}"
+        )
+        # Receive fast registers as they change where the firmware allows it.
+        coordinator.async_start_streaming()
         return True 
     
+    except IndevoltAPIError as err:
+        if coordinator is not None:
+            await coordinator.async_shutdown()
+        raise ConfigEntryNotReady(f"Device not reachable: {err}") from err
+
     except Exception as err:
         _LOGGER.exception("Unexpected error occurred while setting config entry.")
         
         # Clean up partially created resources.
         if entry.entry_id in hass.data.get(DOMAIN, {}):
             del hass.data[DOMAIN][entry.entry_id]
+        if coordinator is not None:
+            await coordinator.async_shutdown()
         
         raise ConfigEntryNotReady from err
 
@@ -65,5 +111,10 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         
         if not hass.data[DOMAIN]:
             hass.data.pop(DOMAIN)
+            hass.data.pop(DATA_HUB, None)
     
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the saved register values of a removed config entry."""
+    await Store(hass, STORAGE_VERSION, storage_key(entry.entry_id)).async_remove()
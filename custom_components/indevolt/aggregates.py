@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+"""Rolling min/max/mean of register values over short time windows."""
+
+import math
+from array import array
+from typing import Tuple
+
+
+class RollingAggregate:
+    """
+    Ring buffer of per-bucket sample statistics of one register.
+    Samples are folded into fixed-width time buckets as they arrive, so memory
+    does not grow with the poll rate, and a window is summarised by combining
+    at most span / bucket buckets.
+    """
+
+    __slots__ = ("bucket", "starts", "counts", "sums", "minimums", "maximums")
+
+    def __init__(self, span: int, bucket: int):
+        # One extra bucket for the partly elapsed bucket at the start of the longest window.
+        size = -(-span // bucket) + 1
+        self.bucket = bucket
+        self.starts = array("d", [-math.inf]) * size
+        self.counts = array("L", [0]) * size
+        self.sums = array("d", [0.0]) * size
+        self.minimums = array("d", [0.0]) * size
+        self.maximums = array("d", [0.0]) * size
+
+    def add(self, value: float, now: float) -> None:
+        """Add a sample taken at a monotonic time."""
+        start = now - now % self.bucket
+        index = int(start // self.bucket) % len(self.starts)
+        if self.starts[index] != start:
+            self.starts[index] = start
+            self.counts[index] = 1
+            self.sums[index] = self.minimums[index] = self.maximums[index] = value
+            return
+        self.counts[index] += 1
+        self.sums[index] += value
+        if value < self.minimums[index]:
+            self.minimums[index] = value
+        elif value > self.maximums[index]:
+            self.maximums[index] = value
+
+    def window(self, seconds: int, now: float) -> Tuple[float, float, float] | None:
+        """Return min, max and mean of the buckets overlapping the last seconds, or None without samples."""
+        oldest = now - seconds - self.bucket
+        count = 0
+        total = 0.0
+        minimum = math.inf
+        maximum = -math.inf
+        for index, start in enumerate(self.starts):
+            if start <= oldest:
+                continue
+            count += self.counts[index]
+            total += self.sums[index]
+            minimum = min(minimum, self.minimums[index])
+            maximum = max(maximum, self.maximums[index])
+        if not count:
+            return None
+        return minimum, maximum, total / count
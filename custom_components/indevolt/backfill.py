@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+"""
+Hourly long-term statistics of cumulative counters rebuilt across a gap in
+which the device could not be read.
+
+While the device is unreachable its sensors are unavailable and the recorder
+compiles no statistics, so the energy of the whole gap lands in the hour the
+device came back. The counters tell how much energy went by during the gap;
+spreading it linearly over the hours of the gap and importing those hours
+gives the energy dashboard a slope instead of a step.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .const import BACKFILL_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = timedelta(hours=1)
+
+
+def interpolate_hours(
+    start: datetime, start_value: float, end: datetime, end_value: float
+) -> List[Tuple[datetime, float]]:
+    """
+    Return the start of every hour from the one containing start up to the
+    one before the hour containing end, each with the counter value at its
+    end, interpolated linearly between the two readings.
+    """
+    if end <= start or end_value < start_value:
+        return []
+    rate = (end_value - start_value) / (end - start).total_seconds()
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    last = end.replace(minute=0, second=0, microsecond=0)
+    hours = []
+    while hour < last:
+        hours.append((hour, start_value + rate * (hour + HOUR - start).total_seconds()))
+        hour += HOUR
+    return hours
+
+
+async def async_backfill(
+    hass: HomeAssistant,
+    statistic_id: str,
+    unit: str | None,
+    hours: List[Tuple[datetime, float]],
+) -> None:
+    """
+    Import interpolated hours of a counter sensor's statistics.
+    Waits until the recorder compiled the last hour of the gap, then anchors
+    the sums to the last compiled hour: for a counter that did not reset, sum
+    minus state stays the same from hour to hour.
+    """
+    if not hours or "recorder" not in hass.config.components:
+        return
+    # Imported here: the recorder and its database libraries are only loaded
+    # when Home Assistant runs it.
+    from homeassistant.components.recorder import get_instance
+    from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+    from homeassistant.components.recorder.statistics import async_import_statistics, get_last_statistics
+
+    end = hours[-1][0] + HOUR
+    delay = (end - dt_util.utcnow()).total_seconds() + BACKFILL_DELAY
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+    last = await get_instance(hass).async_add_executor_job(
+        get_last_statistics, hass, 1, statistic_id, False, {"state", "sum"}
+    )
+    rows = last.get(statistic_id)
+    if not rows or rows[0].get("state") is None or rows[0].get("sum") is None:
+        _LOGGER.debug("No statistics of %s to anchor the backfill to", statistic_id)
+        return
+    row = rows[0]
+    # A row at or after the end means the recorder has already moved on past the gap.
+    if row["start"] >= end.timestamp():
+        return
+    offset = row["sum"] - row["state"]
+
+    metadata = StatisticMetaData(
+        has_mean=False,
+        has_sum=True,
+        name=None,
+        source="recorder",
+        statistic_id=statistic_id,
+        unit_of_measurement=unit,
+    )
+    async_import_statistics(
+        hass,
+        metadata,
+        [StatisticData(start=hour, state=value, sum=value + offset) for hour, value in hours],
+    )
+    _LOGGER.debug("Backfilled %d hours of %s from %s", len(hours), statistic_id, hours[0][0])
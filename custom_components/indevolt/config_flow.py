@@ -1,74 +1,206 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 import voluptuous as vol
-from homeassistant.config_entries import ConfigFlow
+from homeassistant.config_entries import SOURCE_INTEGRATION_DISCOVERY, ConfigFlow
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from .const import DOMAIN, DEFAULT_PORT, DEFAULT_SCAN_INTERVAL, SUPPORTED_MODELS
-from .utils import get_device_gen
+from .const import DOMAIN, DEFAULT_PORT, DEFAULT_SCAN_INTERVAL, DEFAULT_MAX_CONCURRENCY, DEFAULT_MIN_SCAN_INTERVAL, DEFAULT_MAX_SCAN_INTERVAL, DEFAULT_FW_VERSIONS, MIN_SCAN_INTERVAL
+from .discovery import DiscoveredDevice, async_identify, async_scan
+from .register_map import async_get_generation_keys, async_get_models
 import logging
 import asyncio
-from .coordinator import IndevoltAPI
+from .indevolt_api import IndevoltAPI, IndevoltAPIError, IndevoltNotADevice, IndevoltTimeoutError
+
+if TYPE_CHECKING:
+    from homeassistant.components.dhcp import DhcpServiceInfo
 
 _LOGGER = logging.getLogger(__name__)
 
+# Polling options asked for by every setup step.
+OPTIONS_SCHEMA = {
+    vol.Optional("scan_interval", default=DEFAULT_SCAN_INTERVAL): vol.All(int, vol.Range(min=MIN_SCAN_INTERVAL)),
+    vol.Optional("max_concurrency", default=DEFAULT_MAX_CONCURRENCY): vol.All(int, vol.Range(min=1, max=8)),
+    vol.Optional("adaptive_interval", default=False): bool,
+    vol.Optional("min_scan_interval", default=DEFAULT_MIN_SCAN_INTERVAL): vol.All(int, vol.Range(min=MIN_SCAN_INTERVAL)),
+    vol.Optional("max_scan_interval", default=DEFAULT_MAX_SCAN_INTERVAL): vol.All(int, vol.Range(min=1)),
+    vol.Optional("streaming", default=False): bool,
+}
+
 class IndevoltConfigFlow(ConfigFlow, domain=DOMAIN):
     """Configuration flow for Indevolt integration."""
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        self._device: DiscoveredDevice | None = None
+
     async def async_step_user(self, user_input=None):
         """
         Handle the initial user configuration step.
         This method is called when the user initiates the integration setup.
+        It lets the user enter a device by hand or scan a subnet for devices.
+        """
+        return self.async_show_menu(step_id="user", menu_options=["manual", "scan"])
+
+    async def async_step_manual(self, user_input=None):
+        """
+        Handle manual entry of a device.
         It presents a form for device connection parameters and validates them.
+        The model is detected from the device when it is left empty.
         """
-        
+
         errors = {}
+        models = await async_get_models(self.hass)
         if user_input is not None:
             host = user_input["host"]
             port = user_input.get("port", DEFAULT_PORT)
-            scan_interval = user_input.get("scan_interval", DEFAULT_SCAN_INTERVAL)
-            device_model = user_input["device_model"]
 
             api = IndevoltAPI(host, port, async_get_clientsession(self.hass))
 
-            device_gen = get_device_gen(device_model)
-            
-
+            device = None
             try:
-                fw_version=""
-                if device_gen == 1:
-                    fw_version="V1.3.0A_R006.072_M4848_00000039"
-                else:
-                    fw_version="V1.3.09_R00D.012_M4801_00000015"
-
-                data = await api.fetch_data([0])
-                device_sn = data.get("0")
-
-                # Create configuration entry on successful connection.
-                return self.async_create_entry(
-                    title=f"INDEVOLT {device_model} ({host})", # Entry title shown in HA UI.
-                    data={
-                        "host": host,
-                        "port": port,
-                        "scan_interval": scan_interval,
-                        "sn": device_sn,
-                        "device_model": device_model,
-                        "fw_version": fw_version
-                    }
-                )
-            
-            except asyncio.TimeoutError:
+                device = await async_identify(api, await async_get_generation_keys(self.hass))
+            except (asyncio.TimeoutError, IndevoltTimeoutError):
                 errors["base"] = "timeout"
+            except IndevoltNotADevice:
+                errors["base"] = "not_a_device"
+            except IndevoltAPIError:
+                errors["base"] = "cannot_connect"
             except Exception as e:
                 _LOGGER.error("Unknown error occurred while verifying device: %s", str(e), exc_info=True)
                 errors["base"] = "unknown"
 
+            if device is not None:
+                gen = models[user_input["device_model"]] if "device_model" in user_input else device.gen
+                if gen is None:
+                    errors["device_model"] = "unknown_model"
+                else:
+                    await self.async_set_unique_id(device.sn)
+                    self._abort_if_unique_id_configured(updates={"host": host, "port": port})
+                    self._async_abort_entries_match({"sn": device.sn})
+                    return await self._async_create_device_entry(device, gen, user_input)
+
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema({
                 vol.Required("host"): str,
                 vol.Optional("port", default=DEFAULT_PORT): int,
-                vol.Optional("scan_interval", default=DEFAULT_SCAN_INTERVAL): int,
-                vol.Required("device_model"): vol.In(SUPPORTED_MODELS),
+                **OPTIONS_SCHEMA,
+                vol.Optional("device_model"): vol.In(list(models)),
+            }),
+            errors=errors
+        )
+
+    async def async_step_scan(self, user_input=None):
+        """
+        Scan a subnet for devices.
+        The first new device found continues in this flow; every other one is
+        offered as a discovered device.
+        """
+        errors = {}
+        if user_input is not None:
+            try:
+                devices = await async_scan(
+                    async_get_clientsession(self.hass),
+                    user_input["subnet"],
+                    await async_get_generation_keys(self.hass),
+                    user_input.get("port", DEFAULT_PORT),
+                )
+            except ValueError:
+                errors["subnet"] = "invalid_subnet"
+            else:
+                configured = self._async_current_ids() | {
+                    entry.data.get("sn") for entry in self._async_current_entries()
+                }
+                devices = [device for device in devices if device.sn not in configured]
+                if not devices:
+                    errors["base"] = "no_devices_found"
+                else:
+                    for device in devices[1:]:
+                        self.hass.async_create_task(
+                            self.hass.config_entries.flow.async_init(
+                                DOMAIN,
+                                context={"source": SOURCE_INTEGRATION_DISCOVERY},
+                                data=device,
+                            )
+                        )
+                    return await self._async_step_discovered(devices[0])
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema({
+                vol.Required("subnet"): str,
+                vol.Optional("port", default=DEFAULT_PORT): int,
             }),
             errors=errors
         )
+
+    async def async_step_integration_discovery(self, discovery_info: DiscoveredDevice):
+        """Handle a device found by a subnet scan."""
+        return await self._async_step_discovered(discovery_info)
+
+    async def async_step_dhcp(self, discovery_info: DhcpServiceInfo):
+        """Handle a device announced by DHCP."""
+        self._async_abort_entries_match({"host": discovery_info.ip})
+        api = IndevoltAPI(discovery_info.ip, DEFAULT_PORT, async_get_clientsession(self.hass))
+        try:
+            device = await async_identify(api, await async_get_generation_keys(self.hass))
+        except IndevoltNotADevice:
+            return self.async_abort(reason="not_a_device")
+        except IndevoltAPIError:
+            return self.async_abort(reason="cannot_connect")
+        return await self._async_step_discovered(device)
+
+    async def _async_step_discovered(self, device: DiscoveredDevice):
+        """Remember a discovered device, unless it is configured already, and ask for confirmation."""
+        await self.async_set_unique_id(device.sn)
+        self._abort_if_unique_id_configured(updates={"host": device.host, "port": device.port})
+        self._async_abort_entries_match({"sn": device.sn})
+        self._async_abort_entries_match({"host": device.host})
+        self._device = device
+        self.context["title_placeholders"] = {"name": f"INDEVOLT {device.sn}"}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(self, user_input=None):
+        """Confirm adding a discovered device, asking for its model only when it was not detected."""
+        device = self._device
+        models = await async_get_models(self.hass)
+        if user_input is not None:
+            gen = models[user_input["device_model"]] if "device_model" in user_input else device.gen
+            return await self._async_create_device_entry(device, gen, user_input)
+
+        schema = dict(OPTIONS_SCHEMA)
+        if device.gen is None:
+            schema[vol.Required("device_model")] = vol.In(list(models))
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            data_schema=vol.Schema(schema),
+            description_placeholders={"host": device.host, "sn": device.sn},
+        )
+
+    async def _async_create_device_entry(self, device: DiscoveredDevice, gen: int, user_input):
+        """Create the config entry of an identified device."""
+        models = await async_get_models(self.hass)
+        # Without a model from the user, name the device after the first model of its generation.
+        device_model = user_input.get("device_model") or next(
+            model for model, model_gen in models.items() if model_gen == gen
+        )
+        # Create configuration entry on successful connection.
+        return self.async_create_entry(
+            title=f"INDEVOLT {device_model} ({device.host})", # Entry title shown in HA UI.
+            data={
+                "host": device.host,
+                "port": device.port,
+                "scan_interval": user_input.get("scan_interval", DEFAULT_SCAN_INTERVAL),
+                "max_concurrency": user_input.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+                "adaptive_interval": user_input.get("adaptive_interval", False),
+                "min_scan_interval": user_input.get("min_scan_interval", DEFAULT_MIN_SCAN_INTERVAL),
+                "max_scan_interval": user_input.get("max_scan_interval", DEFAULT_MAX_SCAN_INTERVAL),
+                "streaming": user_input.get("streaming", False),
+                "sn": device.sn,
+                "device_model": device_model,
+                "device_gen": gen,
+                "fw_version": DEFAULT_FW_VERSIONS.get(gen, "unknown")
+            }
+        )
@@ -3,11 +3,78 @@ from homeassistant.const import Platform
 DOMAIN = "indevolt"
 DEFAULT_PORT = 8080
 DEFAULT_SCAN_INTERVAL = 30
+DEFAULT_MAX_CONCURRENCY = 2
+
+# Key of the shared hub in hass.data and its limit of concurrent requests
+# across all devices, on top of one request per device.
+DATA_HUB = f"{DOMAIN}_hub"
+DEFAULT_HUB_MAX_REQUESTS = 8
+
+# Polling tiers. Fast registers are read on every update, slow and static
+# registers only once their tier interval (in seconds) has elapsed.
+POLL_TIER_FAST = "fast"
+POLL_TIER_SLOW = "slow"
+POLL_TIER_STATIC = "static"
+POLL_TIER_INTERVALS = {
+    POLL_TIER_FAST: 0,
+    POLL_TIER_SLOW: 300,
+    POLL_TIER_STATIC: 900,
+}
+
+# Adaptive polling: bounds of the update interval (in seconds), the power
+# step (in W) between two polls that counts as a fast change, and how many
+# times the measured poll latency the interval must at least be.
+DEFAULT_MIN_SCAN_INTERVAL = 5
+# Lowest update interval (in seconds) the options accept, for the fixed
+# interval and the adaptive lower bound alike.
+MIN_SCAN_INTERVAL = 5
+DEFAULT_MAX_SCAN_INTERVAL = 120
+ADAPTIVE_POWER_STEP = 100
+ADAPTIVE_LATENCY_FACTOR = 4
+
+# Seconds to wait before retrying the event stream after the firmware
+# refused it, or after an established stream dropped.
+STREAM_RETRY_UNSUPPORTED = 3600
+STREAM_RETRY_DROPPED = 30
+
+# Last known register values, saved per config entry so entities have
+# values at startup before the first poll answers. Saves are delayed by
+# STORAGE_SAVE_DELAY seconds and coalesced.
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 60
+
+# Seconds register writes are collected before they are sent together.
+WRITE_DEBOUNCE = 0.5
+
+# Rolling aggregates: registers summarised, window lengths and bucket width
+# (in seconds), and the statistics exposed per window.
+AGGREGATE_KEYS = ("6000", "2108", "11016", "667", "21028")
+AGGREGATE_WINDOWS = (60, 300, 900)
+AGGREGATE_BUCKET = 15
+AGGREGATE_STATISTICS = ("min", "max", "mean")
+
+# Statistics backfill: cumulative counters whose hourly statistics are
+# rebuilt after the device was unreachable for BACKFILL_MIN_GAP seconds or
+# more, and how many seconds past the hour to wait so the recorder has
+# compiled the hours of the gap first.
+BACKFILL_KEYS = ("1505", "2107", "6006", "6007")
+BACKFILL_MIN_GAP = 900
+BACKFILL_DELAY = 900
+
+# Poll tracing, enabled with debug logging: number of polls whose timings
+# are kept, and the duration in seconds from which a poll is reported as slow.
+TRACE_SIZE = 100
+TRACE_SLOW_POLL = 5
+
+# The number and select platforms join once registers have a verified
+# Indevolt.SetData address ("write_key" in the register map).
 PLATFORMS = [
     Platform.SENSOR
 ]
 
-SUPPORTED_MODELS = [
-    "BK1600/BK1600Ultra",
-    "SolidFlex/PowerFlex2000"
-]
+# Firmware versions reported for each device generation. No register with the
+# firmware version is known yet, so these are not read from the device.
+DEFAULT_FW_VERSIONS = {
+    1: "V1.3.0A_R006.072_M4848_00000039",
+    2: "V1.3.09_R00D.012_M4801_00000015",
+}
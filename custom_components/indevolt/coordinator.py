@@ -2,56 +2,610 @@ from __future__ import annotations
 
 """Home Assistant integration for indevolt device."""
 
+import asyncio
+import json
 import logging
-from typing import Any, Dict
-from datetime import timedelta
+import math
+import time
+from array import array
+from collections import deque
+from typing import Any, Dict, List, Set, Tuple
+from datetime import datetime, timedelta
 
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, DEFAULT_SCAN_INTERVAL
-from .indevolt_api import IndevoltAPI
-from .utils import get_device_gen
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .const import (
+    DOMAIN,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_MIN_SCAN_INTERVAL,
+    DEFAULT_MAX_SCAN_INTERVAL,
+    ADAPTIVE_POWER_STEP,
+    ADAPTIVE_LATENCY_FACTOR,
+    AGGREGATE_BUCKET,
+    AGGREGATE_KEYS,
+    AGGREGATE_WINDOWS,
+    BACKFILL_KEYS,
+    BACKFILL_MIN_GAP,
+    POLL_TIER_FAST,
+    POLL_TIER_INTERVALS,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+    STREAM_RETRY_DROPPED,
+    STREAM_RETRY_UNSUPPORTED,
+    TRACE_SIZE,
+    TRACE_SLOW_POLL,
+    WRITE_DEBOUNCE,
+)
+from .aggregates import RollingAggregate
+from .backfill import async_backfill, interpolate_hours
+from .energy import EnergyIntegrator
+from .hub import IndevoltHub
+from .snapshot import RegisterSnapshot
+from .indevolt_api import (
+    CACHE_TTL,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    IndevoltAPI,
+    IndevoltAPIError,
+    IndevoltStreamUnsupported,
+)
+from .register_map import RegisterMap
+from .sensor import ENERGY_SENSORS
+from .tracing import PollTrace
 
 _LOGGER = logging.getLogger(__name__)
 
+# Registers read by the adaptive interval: battery state and DC input power.
+BATTERY_STATE_KEY = "6001"
+BATTERY_STATE_STATIC = 1000
+BATTERY_STATES_ACTIVE = (1001, 1002)
+DC_INPUT_KEYS = ("1664", "1665", "1666", "1667")
+
+def storage_key(entry_id: str) -> str:
+    """Return the storage key of the last known register values of a config entry."""
+    return f"{DOMAIN}.{entry_id}"
+
 class IndevoltCoordinator(DataUpdateCoordinator):
-    def __init__(self, hass, config):
+    def __init__(self, hass, config, register_map: RegisterMap, hub: IndevoltHub | None = None):
         super().__init__(
             hass,
             _LOGGER,
-            name=DOMAIN,
+            name=f"{DOMAIN} {config['host']}",
             update_interval=timedelta(seconds=config.get("scan_interval", DEFAULT_SCAN_INTERVAL)),
         )
         self.config = config
-        self.session = async_get_clientsession(hass)
         
-        # Initialize Indevolt API.
+        # Reads are cached for less than half the shortest update interval,
+        # so a poll never gets the values read by the one before.
+        shortest_interval = config.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+        if config.get("adaptive_interval", False):
+            shortest_interval = min(
+                shortest_interval, config.get("min_scan_interval", DEFAULT_MIN_SCAN_INTERVAL)
+            )
+
+        # Initialize Indevolt API with its own keep-alive connection pool.
         self.api = IndevoltAPI(
             host=config['host'],
             port=config['port'],
-            session=async_get_clientsession(self.hass)
+            max_concurrency=config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY),
+            request_limiter=hub.device_request_limiter() if hub else None,
+            cache_ttl=min(CACHE_TTL, shortest_interval / 2),
         )
+
+        # The hub, when present, owns the poll timer of this coordinator.
+        self.hub = hub
+        if hub is not None:
+            hub.async_add(self)
+
+        # Sensor descriptions of the registers of this device, indexed by key.
+        self.registers = register_map.descriptions
+        # Decoded native values of the registers, one slot per register.
+        self.table = register_map.table
+        self.values = self.table.new_values()
+        # Raw register values, updated in place and returned as the coordinator data.
+        self.snapshot = RegisterSnapshot(self.table)
+        # Request priority of the registers that are not of normal priority.
+        self._priorities: Dict[int, int] = {
+            int(key): description.priority for key, description in self.registers.items()
+            if description.priority != PRIORITY_NORMAL
+        }
+        # Low-priority keys left out of an overrunning poll, read by the next one.
+        self._deferred: Set[str] = set()
+        # Number of enabled entities reading each key.
+        self._key_refs: Dict[str, int] = {}
+        # When each polling tier was last polled.
+        self._tier_polled: Dict[str, float] = {}
+        # Adaptive update interval and the registers it depends on.
+        self.scan_interval = config.get("scan_interval", DEFAULT_SCAN_INTERVAL)
+        self.adaptive = config.get("adaptive_interval", False)
+        self.min_scan_interval = config.get("min_scan_interval", DEFAULT_MIN_SCAN_INTERVAL)
+        self.max_scan_interval = config.get("max_scan_interval", DEFAULT_MAX_SCAN_INTERVAL)
+        self._required_keys: Set[str] = set()
+        if self.adaptive:
+            self._required_keys = {
+                key for key in (BATTERY_STATE_KEY, *DC_INPUT_KEYS) if key in self.registers
+            }
+        self.poll_duration: float | None = None
+        # Requests sent by the last poll and time of the last successful poll.
+        self.poll_requests = 0
+        self.last_success_time: datetime | None = None
+        # When the device was last read, kept across restarts to detect gaps.
+        self._last_seen: datetime | None = None
+
+        # Event stream: whether it is connected, its task and when each key
+        # was last pushed by it. Off unless enabled in the options.
+        self.streaming_enabled = config.get("streaming", False)
+        self.streaming = False
+        self._stream_task: asyncio.Task | None = None
+        self._pushed_at: Dict[str, float] = {}
+
+        # Raw values last published to entities and the keys changed by the last update.
+        self._published = array("d", [math.nan]) * len(self.table.keys)
+        self.changed_keys: Set[str] = set()
+
+        # Rolling min/max/mean of the high-rate power registers.
+        self.aggregates: Dict[str, RollingAggregate] = {
+            key: RollingAggregate(max(AGGREGATE_WINDOWS), AGGREGATE_BUCKET)
+            for key in AGGREGATE_KEYS if key in self.registers
+        }
+        # Energy integrated from power samples, for the registers this generation has.
+        self.energy_sensors = {
+            description.key: description for description in ENERGY_SENSORS
+            if description.power_key in self.registers and description.counter_key in self.registers
+        }
+        self.integrators = {key: EnergyIntegrator() for key in self.energy_sensors}
+
+        # Register writes waiting to be sent, the callers waiting for them,
+        # the timer that sends them and the lock that keeps flushes apart.
+        self._pending_writes: Dict[str, int] = {}
+        self._write_waiters: List[asyncio.Future] = []
+        self._unsub_write: CALLBACK_TYPE | None = None
+        self._write_lock = asyncio.Lock()
+
+        # Timings of recent polls, recorded while debug logging is enabled,
+        # and the trace of the poll in progress.
+        self.traces: deque[PollTrace] = deque(maxlen=TRACE_SIZE)
+        self._trace: PollTrace | None = None
+
+        # Last known register values, kept across restarts.
+        self._store: Store | None = None
+        if self.config_entry is not None:
+            self._store = Store(hass, STORAGE_VERSION, storage_key(self.config_entry.entry_id))
+
+    @callback
+    def async_register_key(self, key: str) -> CALLBACK_TYPE:
+        """Add a key to the poll set until the returned callback is called."""
+        self._key_refs[key] = self._key_refs.get(key, 0) + 1
+
+        @callback
+        def unregister() -> None:
+            self._key_refs[key] -= 1
+            if not self._key_refs[key]:
+                del self._key_refs[key]
+
+        return unregister
+
+    async def async_shutdown(self) -> None:
+        """Cancel polling and streaming, save the last values and close the connection pool of the device."""
+        await super().async_shutdown()
+        if self._stream_task is not None:
+            self._stream_task.cancel()
+            self._stream_task = None
+        if self.hub is not None:
+            self.hub.async_remove(self)
+        if self._unsub_write is not None:
+            self._unsub_write()
+            self._unsub_write = None
+        for waiter in self._write_waiters:
+            waiter.cancel()
+        self._write_waiters.clear()
+        if self._store is not None and self.snapshot.generation:
+            await self._store.async_save(self._data_to_store())
+        await self.api.async_close()
+
+    async def async_write(self, key: str, value: int) -> None:
+        """
+        Write a raw register value and refresh it.
+        Writes arriving within the debounce delay are sent together, the last
+        value of a register winning, so slider drags and automation bursts
+        become a single request. Writes arriving while a flush is in flight
+        are sent by the next one. Raises IndevoltAPIError when the write fails,
+        and ValueError for a register without a verified write address.
+        """
+        if self.registers[key].write_key is None:
+            raise ValueError(f"Register {key} has no verified write address")
+        self._pending_writes[key] = value
+        waiter = self.hass.loop.create_future()
+        self._write_waiters.append(waiter)
+        self._schedule_write_flush()
+        await waiter
+
+    @callback
+    def _schedule_write_flush(self) -> None:
+        """Start the debounce timer of the pending writes unless it is running."""
+        if self._unsub_write is None:
+            self._unsub_write = async_call_later(self.hass, WRITE_DEBOUNCE, self._async_write_timer)
+
+    async def _async_write_timer(self, _now: datetime) -> None:
+        """Flush the pending writes, re-arming the timer for writes that arrived meanwhile."""
+        self._unsub_write = None
+        async with self._write_lock:
+            await self._async_flush_writes()
+        if self._pending_writes:
+            self._schedule_write_flush()
+
+    async def _async_flush_writes(self) -> None:
+        """Send the collected writes to their write addresses, then read back only the written registers."""
+        writes, self._pending_writes = self._pending_writes, {}
+        waiters, self._write_waiters = self._write_waiters, []
+        if not writes:
+            return
+        try:
+            await self.api.set_data({int(self.registers[key].write_key): value for key, value in writes.items()})
+            result = await self.api.fetch_data([int(key) for key in writes], priority=PRIORITY_HIGH)
+        except Exception as err:
+            # Handed to the waiting callers, which raise it.
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(err)
+            return
+        self._merge(result)
+        self.async_update_listeners()
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def async_restore(self) -> bool:
+        """Load the register values saved by the previous run, returning whether there were any."""
+        if self._store is None:
+            return False
+        stored = await self._store.async_load()
+        if not stored or not stored.get("data"):
+            return False
+        # Decode without sampling: aggregates and integrators only take live values.
+        changed = self.snapshot.update(stored["data"])
+        self.changed_keys = self._diff(changed)
+        self.table.decode(self.snapshot, changed, self.values)
+        self.data = self.snapshot
+        if stored.get("time"):
+            self._last_seen = dt_util.parse_datetime(stored["time"])
+        return True
+
+    def _data_to_store(self) -> Dict[str, Any]:
+        return {
+            "data": self.snapshot.as_dict(),
+            "time": self._last_seen.isoformat() if self._last_seen else None,
+        }
+
+    def _gap_counters(self, now: datetime) -> Dict[str, float]:
+        """
+        Return the last decoded value of each backfilled counter when the
+        device was not read for a gap long enough to lose statistics.
+        """
+        if self._last_seen is None:
+            return {}
+        gap = (now - self._last_seen).total_seconds()
+        if gap < max(BACKFILL_MIN_GAP, 2 * self.update_interval.total_seconds()):
+            return {}
+        counters = {}
+        for key in BACKFILL_KEYS:
+            slot = self.table.slots.get(key)
+            if slot is not None and self.values[slot] is not None:
+                counters[key] = self.values[slot]
+        return counters
+
+    @callback
+    def _async_backfill_gap(self, start: datetime, end: datetime, counters: Dict[str, float]) -> None:
+        """Rebuild the hourly statistics of the counter sensors over a gap, from their readings on both sides."""
+        if self.config_entry is None:
+            return
+        entity_registry = er.async_get(self.hass)
+        sn = self.config_entry.data.get("sn", "unknown")
+        for key, start_value in counters.items():
+            end_value = self.values[self.table.slots[key]]
+            hours = interpolate_hours(start, start_value, end, end_value) if end_value is not None else []
+            if not hours:
+                continue
+            entity_id = entity_registry.async_get_entity_id(
+                "sensor", DOMAIN, f"{DOMAIN}_{sn}_{self.config_entry.entry_id}_{key}"
+            )
+            if entity_id is None:
+                continue
+            _LOGGER.debug("%s was unreachable since %s, backfilling %s", self.name, start, entity_id)
+            self.config_entry.async_create_background_task(
+                self.hass,
+                async_backfill(self.hass, entity_id, self.registers[key].native_unit_of_measurement, hours),
+                f"{self.name} backfill {entity_id}",
+            )
+
+    async def _async_refresh(self, *args, **kwargs) -> None:
+        """Refresh, tracing the phases of the poll while debug logging is enabled."""
+        if not _LOGGER.isEnabledFor(logging.DEBUG):
+            await super()._async_refresh(*args, **kwargs)
+            return
+        trace = self._trace = self.api.trace = PollTrace()
+        start = time.monotonic()
+        try:
+            await super()._async_refresh(*args, **kwargs)
+        finally:
+            self._trace = self.api.trace = None
+            trace.duration = time.monotonic() - start
+            self.traces.append(trace)
+            if trace.duration >= TRACE_SLOW_POLL:
+                _LOGGER.warning(
+                    "Slow poll of %s took %.2f s: %s", self.name, trace.duration, json.dumps(trace.as_dict())
+                )
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, timing the dispatch while a poll is traced."""
+        if self._trace is None:
+            super().async_update_listeners()
+            return
+        start = time.monotonic()
+        super().async_update_listeners()
+        self._trace.add("dispatch", time.monotonic() - start)
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule the next poll, through the hub when the device belongs to one."""
+        if self.hub is None:
+            super()._schedule_refresh()
+            return
+        if self.update_interval is None:
+            return
+        if self.config_entry and self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        self._unsub_refresh = self.hub.async_schedule(self)
+
+    @callback
+    def async_start_streaming(self) -> None:
+        """Start receiving fast registers over the event stream, if enabled."""
+        if self.streaming_enabled and self._stream_task is None:
+            self._stream_task = self.hass.async_create_background_task(
+                self._async_stream(), f"{self.name} event stream"
+            )
+
+    async def _async_stream(self) -> None:
+        """
+        Keep the event stream connected, falling back to polling while it is down.
+        While the circuit breaker of the device is open, the stream is not
+        reconnected and only the breaker probes the device.
+        """
+        while True:
+            if self.api.breaker.is_open:
+                await asyncio.sleep(STREAM_RETRY_DROPPED)
+                continue
+            keys = [int(key) for key in self.poll_keys() if self.registers[key].poll_tier == POLL_TIER_FAST]
+            try:
+                await self.api.stream(keys, self._async_handle_push)
+                delay = STREAM_RETRY_DROPPED
+            except IndevoltStreamUnsupported as err:
+                _LOGGER.debug("%s: %s, polling instead", self.name, err)
+                delay = STREAM_RETRY_UNSUPPORTED
+            except IndevoltAPIError as err:
+                _LOGGER.debug("%s: event stream failed: %s", self.name, err)
+                delay = STREAM_RETRY_DROPPED
+            finally:
+                self.streaming = False
+                self._pushed_at.clear()
+            await asyncio.sleep(delay)
+
+    @callback
+    def _async_handle_push(self, values: Dict[str, Any]) -> None:
+        """Merge register values pushed by the device into the coordinator data."""
+        self.streaming = True
+        now = time.monotonic()
+        for key in values:
+            self._pushed_at[key] = now
+        self._merge(values)
+        self.async_set_updated_data(self.snapshot)
+
+    def poll_keys(self) -> List[str]:
+        """Return the keys read by enabled entities, or all keys before any entity is added."""
+        if not self._key_refs:
+            return list(self.registers)
+        return [
+            key for key in self.registers
+            if key in self._key_refs or key in self._required_keys
+        ]
+
+    def _due_tiers(self, now: float) -> List[str]:
+        """Return the polling tiers whose interval has elapsed."""
+        # Allow half an update interval of slack so timer jitter does not
+        # push a tier back by a whole cycle.
+        slack = self.update_interval.total_seconds() / 2
+        return [
+            tier for tier, interval in POLL_TIER_INTERVALS.items()
+            if tier not in self._tier_polled or now - self._tier_polled[tier] >= interval - slack
+        ]
+
+    def _due_keys(self, tiers: List[str], now: float) -> List[int]:
+        """
+        Return the keys to poll this cycle: due tiers, keys without a value
+        yet and keys deferred by the last poll, except keys the event stream
+        pushed within the update interval. While the last poll took longer
+        than the update interval, low-priority keys that have a value are
+        deferred to the next poll, so the device catches up on the others.
+        A poll closing a gap in the statistics always reads the backfilled
+        counters, as only values read by it tell how far they moved.
+        """
+        data = self.snapshot
+        interval = self.update_interval.total_seconds()
+        fresh = now - interval
+        overrun = self.poll_duration is not None and self.poll_duration > interval
+        deferred, self._deferred = self._deferred, set()
+        closing_gap = bool(self._gap_counters(dt_util.utcnow()))
+        keys = []
+        for key in self.poll_keys():
+            description = self.registers[key]
+            if closing_gap and key in BACKFILL_KEYS:
+                keys.append(int(key))
+                continue
+            if not (description.poll_tier in tiers or key not in data or key in deferred):
+                continue
+            if self._pushed_at.get(key, fresh) > fresh:
+                continue
+            if overrun and description.priority == PRIORITY_LOW and key in data:
+                self._deferred.add(key)
+                continue
+            keys.append(int(key))
+        if self._deferred:
+            _LOGGER.debug("%s: last poll overran, deferring %s", self.name, sorted(self._deferred, key=int))
+        return keys
     
-    async def _async_update_data(self) -> Dict[str, Any]:
+    def _adapt_interval(self, previous: Dict[str, Any]) -> None:
+        """
+        Pick the next update interval from device activity and poll latency.
+        Poll at the floor while the battery is active or power moves quickly,
+        at the ceiling while the battery is idle without DC input (at night),
+        halfway between the scan interval and the ceiling while the battery is
+        static and power moves slowly, and at the configured scan interval
+        otherwise. Slow responses stretch the interval so the device is never
+        polled faster than it answers.
+        """
+        data = self.snapshot
+        power_step = max(
+            (
+                abs(data[key] - old)
+                for key, old in previous.items()
+                if old is not None
+                and key in data
+                and key in self.registers
+                and self.registers[key].device_class == SensorDeviceClass.POWER
+                and self.registers[key].poll_tier == POLL_TIER_FAST
+            ),
+            default=0,
+        )
+        dc_input = [data.get(key) for key in DC_INPUT_KEYS if key in self.registers]
+
+        if data.get(BATTERY_STATE_KEY) in BATTERY_STATES_ACTIVE or power_step >= ADAPTIVE_POWER_STEP:
+            interval = self.min_scan_interval
+        elif dc_input and all(value == 0 for value in dc_input):
+            interval = self.max_scan_interval
+        elif data.get(BATTERY_STATE_KEY) == BATTERY_STATE_STATIC:
+            interval = (self.scan_interval + self.max_scan_interval) / 2
+        else:
+            interval = self.scan_interval
+
+        if self.poll_duration is not None:
+            interval = max(interval, self.poll_duration * ADAPTIVE_LATENCY_FACTOR)
+        interval = min(max(interval, self.min_scan_interval), self.max_scan_interval)
+
+        if interval != self.update_interval.total_seconds():
+            _LOGGER.debug("Adapting update interval of %s to %.1f s", self.name, interval)
+            self.update_interval = timedelta(seconds=interval)
+
+    def _merge(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Store fetched or pushed values in the snapshot and decode the changed ones.
+        Returns the changed keys with their previous raw value.
+        """
+        changed = self.snapshot.update(result)
+        self.changed_keys = self._diff(changed)
+        self.table.decode(result, changed, self.values)
+        self._sample(result)
+        self._integrate(result)
+        return changed
+
+    def _sample(self, result: Dict[str, Any]) -> None:
+        """Add the decoded values of aggregated registers in a payload to their ring buffers."""
+        now = time.monotonic()
+        for key, aggregate in self.aggregates.items():
+            if key not in result:
+                continue
+            value = self.values[self.table.slots[key]]
+            if value is not None:
+                aggregate.add(value, now)
+
+    def _integrate(self, result: Dict[str, Any]) -> None:
+        """Integrate fresh power samples, then re-anchor to fresh counter readings."""
+        now = time.monotonic()
+        slots = self.table.slots
+        for key, integrator in self.integrators.items():
+            description = self.energy_sensors[key]
+            if description.power_key in result:
+                power = self.values[slots[description.power_key]]
+                if power is not None and description.state_key is not None:
+                    state = self.snapshot.get(description.state_key)
+                    power = None if state is None else abs(power) if state == description.state else 0.0
+                integrator.add(power, now)
+            if description.counter_key in result:
+                counter = self.values[slots[description.counter_key]]
+                if counter is not None:
+                    integrator.reconcile(counter)
+
+    def aggregate(self, key: str, window: int) -> Tuple[float, float, float] | None:
+        """Return min, max and mean of a register over the last window seconds."""
+        return self.aggregates[key].window(window, time.monotonic())
+
+    def _diff(self, changed: Dict[str, Any]) -> Set[str]:
+        """Return the changed keys whose value moved beyond its deadband since it was last published."""
+        published = self._published
+        raw = self.snapshot.raw
+        slots = self.table.slots
+        deadbands = self.table.deadbands
+        result = set()
+        for key in changed:
+            slot = slots.get(key)
+            if slot is None:
+                continue
+            value = raw[slot]
+            deadband = deadbands[slot]
+            if deadband and abs(value - published[slot]) < deadband:
+                continue
+            published[slot] = value
+            result.add(key)
+        return result
+
+    async def _async_update_data(self) -> RegisterSnapshot:
         """Fetch latest data from device."""
+        self.changed_keys = set()
+        requests = self.api.stats.requests
         try:
-            keys=[]
-            if get_device_gen(self.config["device_model"])==1:
-                keys=[7101,1664,1665,2108,1502,1505,2101,2107,1501,6000,6001,6002,6105,6004,6005,6006,6007,7120,21028]
+            now = time.monotonic()
+            tiers = self._due_tiers(now)
+            keys = self._due_keys(tiers, now)
+            try:
+                result = await self.api.fetch_batched(keys, self._priorities) if keys else {}
+            finally:
+                self.poll_requests = self.api.stats.requests - requests
+            self.poll_duration = time.monotonic() - now
+            self.last_success_time = dt_util.utcnow()
+            for tier in tiers:
+                self._tier_polled[tier] = now
+
+            gap_start = self._last_seen
+            counters = self._gap_counters(self.last_success_time)
+            self._last_seen = self.last_success_time
+            if self._trace is None:
+                changed = self._merge(result)
             else:
-                keys=[7101,1664,1665,1666,1667,1501,2108,1502,1505,2101,2107,142,6000,6001,6009,6105,6004,6005,6006,6007,7120,11016,667]
-            
-            data: Dict[str, Any]={}
-            for key in keys:
-                result=await self.api.fetch_data([key])
-                data.update(result)
-
-            return data
+                start = time.monotonic()
+                changed = self._merge(result)
+                self._trace.add("merge", time.monotonic() - start)
+            # Only counters read again this poll tell how far they moved.
+            counters = {key: value for key, value in counters.items() if key in result}
+            if counters:
+                self._async_backfill_gap(gap_start, self.last_success_time, counters)
+            if self.adaptive:
+                self._adapt_interval(changed)
+            if self._store is not None and changed:
+                self._store.async_delay_save(self._data_to_store, STORAGE_SAVE_DELAY)
+            return self.snapshot
         
-        except Exception as err:
-            _LOGGER.error("API request failed: %s", str(err))
-            return self.data or {}
+        except IndevoltAPIError as err:
+            raise UpdateFailed(f"API request failed: {err}") from err
         
         except Exception as err:
             _LOGGER.exception("Unexpected update error")
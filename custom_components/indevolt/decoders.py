@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+"""Register decoders compiled once per register map."""
+
+from typing import Any, Callable, Iterable, List, Mapping
+
+from homeassistant.components.sensor import SensorDeviceClass
+
+from .sensor import IndevoltSensorEntityDescription
+
+
+def compile_decoder(description: IndevoltSensorEntityDescription) -> Callable[[Any], Any]:
+    """Return a function turning a raw register value into the sensor's native value."""
+    if description.device_class == SensorDeviceClass.ENUM:
+        return description.state_mapping.get
+    coefficient = description.coefficient
+    if coefficient == 1:
+        return float
+    return lambda raw: raw * coefficient
+
+
+class RegisterTable:
+    """
+    Slot index, decoders, enum options and deadbands of the registers of one
+    generation.
+    Every register gets a fixed slot, so decoded values of a device live in a
+    flat list that entities read by index.
+    """
+
+    __slots__ = ("keys", "slots", "decoders", "options", "deadbands")
+
+    def __init__(self, descriptions: Mapping[str, IndevoltSensorEntityDescription]):
+        self.keys = tuple(descriptions)
+        self.slots = {key: slot for slot, key in enumerate(self.keys)}
+        self.decoders = tuple(compile_decoder(description) for description in descriptions.values())
+        self.options = tuple(
+            list(dict.fromkeys(description.state_mapping.values()))
+            if description.device_class == SensorDeviceClass.ENUM else None
+            for description in descriptions.values()
+        )
+        self.deadbands = tuple(description.deadband for description in descriptions.values())
+
+    def new_values(self) -> List[Any]:
+        """Return an empty value table."""
+        return [None] * len(self.keys)
+
+    def decode(self, data: Mapping[str, Any], keys: Iterable[str], values: List[Any]) -> None:
+        """Decode the given keys of a payload into their slots of a value table."""
+        slots = self.slots
+        decoders = self.decoders
+        for key in keys:
+            slot = slots.get(key)
+            if slot is None:
+                continue
+            raw = data.get(key)
+            if raw is None:
+                values[slot] = None
+                continue
+            try:
+                values[slot] = decoders[slot](raw)
+            except (TypeError, ValueError):
+                values[slot] = None
+
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+"""Diagnostics support for the indevolt integration."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+TO_REDACT = {"host", "sn"}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """Return polling statistics and the latest data of a config entry."""
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    api = coordinator.api
+
+    return {
+        "entry": async_redact_data(dict(entry.data), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_success_time": coordinator.last_success_time,
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "poll_duration": coordinator.poll_duration,
+            "poll_requests": coordinator.poll_requests,
+            "poll_keys": coordinator.poll_keys(),
+            "streaming_enabled": coordinator.streaming_enabled,
+            "streaming": coordinator.streaming,
+        },
+        "api": {
+            "batch_size": api.batch_size,
+            "unsupported_keys": sorted(api.unsupported),
+            "concurrency_limit": api.limiter.limit,
+            "circuit_open": api.breaker.is_open,
+            "consecutive_failures": api.breaker.failures,
+            **api.stats.as_dict(),
+        },
+        "data": async_redact_data(coordinator.snapshot.as_dict(), {"0"}),
+    }
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+"""Finding Indevolt devices on the local network and identifying them."""
+
+import asyncio
+import ipaddress
+import logging
+from dataclasses import dataclass
+from typing import Dict, List
+
+import aiohttp
+
+from .const import DEFAULT_PORT
+from .indevolt_api import IndevoltAPI, IndevoltAPIError, IndevoltNotADevice
+
+_LOGGER = logging.getLogger(__name__)
+
+# Concurrent probes of a subnet scan, and the largest subnet (in hosts) scanned.
+SCAN_PARALLELISM = 64
+SCAN_MAX_HOSTS = 1024
+
+
+@dataclass(frozen=True)
+class DiscoveredDevice:
+    """A device that answered Indevolt.GetData."""
+
+    host: str
+    port: int
+    sn: str
+    gen: int | None
+
+
+async def async_identify(api: IndevoltAPI, generation_keys: Dict[int, List[str]]) -> DiscoveredDevice:
+    """
+    Read the serial number of a device and detect its generation.
+    generation_keys holds the registers only one generation has; the
+    generation answering most of its own registers wins. The generation is
+    None when they do not tell it apart. Raises IndevoltAPIError when the
+    device does not answer, and IndevoltNotADevice when the host answers
+    without a serial number, as any JSON service would.
+    """
+    data = await api.probe()
+    sn = data.get("0")
+    if sn is None or str(sn) == "":
+        raise IndevoltNotADevice(f"{api.host} answered without a serial number")
+    try:
+        registers = await api.probe([int(key) for keys in generation_keys.values() for key in keys])
+    except IndevoltAPIError as err:
+        _LOGGER.debug("Could not read generation registers of %s: %s", api.host, err)
+        registers = {}
+    answered = {
+        gen: sum(registers.get(key) is not None for key in keys) for gen, keys in generation_keys.items()
+    }
+    best = max(answered.values(), default=0)
+    winners = [gen for gen, count in answered.items() if count == best]
+    gen = winners[0] if best and len(winners) == 1 else None
+    return DiscoveredDevice(api.host, api.port, str(sn), gen)
+
+
+async def async_scan(
+    session: aiohttp.ClientSession,
+    subnet: str,
+    generation_keys: Dict[int, List[str]],
+    port: int = DEFAULT_PORT,
+    parallelism: int = SCAN_PARALLELISM,
+) -> List[DiscoveredDevice]:
+    """
+    Probe every host of a subnet concurrently and return the devices that answered.
+    Raises ValueError for an invalid subnet or one larger than SCAN_MAX_HOSTS.
+    """
+    network = ipaddress.ip_network(subnet, strict=False)
+    if network.num_addresses > SCAN_MAX_HOSTS:
+        raise ValueError(f"Subnet {subnet} has more than {SCAN_MAX_HOSTS} addresses")
+    semaphore = asyncio.Semaphore(parallelism)
+
+    async def probe(host: str) -> DiscoveredDevice | None:
+        async with semaphore:
+            try:
+                return await async_identify(IndevoltAPI(host, port, session), generation_keys)
+            except IndevoltAPIError:
+                return None
+
+    results = await asyncio.gather(*(probe(str(host)) for host in network.hosts()))
+    return [device for device in results if device is not None]
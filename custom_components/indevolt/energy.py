@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+"""Energy integrated from power samples and reconciled with device counters."""
+
+# Samples further apart than this (in seconds) are not integrated across,
+# since the power in between is unknown.
+MAX_SAMPLE_GAP = 600
+
+
+class EnergyIntegrator:
+    """
+    Trapezoidal integral of a power register, anchored to a cumulative counter.
+    Between counter readings the total advances by the integrated power; every
+    new counter reading becomes the new base, which removes the drift the
+    integration picked up. The total never decreases: when the integration ran
+    ahead of the counter, it holds until the counter catches up.
+    """
+
+    __slots__ = ("total", "base", "counter", "integrated", "last_power", "last_time")
+
+    def __init__(self) -> None:
+        self.total: float | None = None
+        self.base: float | None = None
+        self.counter: float | None = None
+        self.integrated = 0.0
+        self.last_power: float | None = None
+        self.last_time: float | None = None
+
+    def restore(self, total: float) -> None:
+        """Continue from a total saved before a restart until the counter is read."""
+        if self.total is None or total > self.total:
+            self.total = self.base = total
+            self.integrated = 0.0
+
+    def add(self, power: float | None, now: float) -> None:
+        """Integrate a power sample in W taken at a monotonic time."""
+        if power is not None and self.last_power is not None and now - self.last_time <= MAX_SAMPLE_GAP:
+            self.integrated += (self.last_power + power) / 2 * (now - self.last_time) / 3_600_000
+            if self.base is not None:
+                self.total = max(self.total, self.base + self.integrated)
+        self.last_power = power
+        self.last_time = now
+
+    def reconcile(self, counter: float) -> None:
+        """Re-anchor the total to a new reading of the device's cumulative counter in kWh."""
+        if counter == self.counter:
+            return
+        self.counter = self.base = counter
+        self.integrated = 0.0
+        self.total = counter if self.total is None else max(self.total, counter)
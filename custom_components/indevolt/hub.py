@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+"""Shared scheduler for all Indevolt devices of a Home Assistant instance."""
+
+import asyncio
+import contextlib
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DEFAULT_HUB_MAX_REQUESTS
+from .indevolt_api import PRIORITY_NORMAL, AdaptiveLimiter
+
+if TYPE_CHECKING:
+    from .coordinator import IndevoltCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DeviceRequestLimiter:
+    """
+    One device's access to the hub-wide request limit.
+    Every device has one slot of its own, so its first request in flight
+    never waits for other devices and an offline unit cannot keep a healthy
+    one from being polled. Further concurrent requests take a shared slot,
+    granted highest priority first. Requests that must not take a shared
+    slot, such as the probe of an open circuit breaker, wait for the
+    device's own slot instead.
+    """
+
+    def __init__(self, shared: AdaptiveLimiter):
+        self._shared = shared
+        self._own = asyncio.Lock()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL, shared: bool = True) -> AsyncIterator[None]:
+        """Hold the device's own slot if it is free, or else a shared one."""
+        if not shared or not self._own.locked():
+            async with self._own:
+                yield
+        else:
+            async with self._shared.slot(priority):
+                yield
+
+
+class IndevoltHub:
+    """
+    Owns the poll timers of all device coordinators.
+    Every device is polled at a fixed phase within its update interval, so the
+    polls of many devices are spread evenly instead of firing in bursts.
+    Beyond one request per device, all devices share one limit on concurrent
+    requests, and each device is polled in its own task so a slow or offline
+    unit never delays the others.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_requests: int = DEFAULT_HUB_MAX_REQUESTS):
+        self.hass = hass
+        # Shared slots, granted in priority order; high-priority requests may
+        # use the reserved slots above the limit.
+        self.request_limiter = AdaptiveLimiter(max_requests)
+        self._coordinators: List[IndevoltCoordinator] = []
+        self._phases: Dict[IndevoltCoordinator, float] = {}
+        self._polls: Dict[IndevoltCoordinator, asyncio.Task] = {}
+
+    @property
+    def coordinators(self) -> List[IndevoltCoordinator]:
+        """Return the coordinators managed by the hub."""
+        return list(self._coordinators)
+
+    def device_request_limiter(self) -> DeviceRequestLimiter:
+        """Return the request limiter of a new device, sharing the hub-wide limit."""
+        return DeviceRequestLimiter(self.request_limiter)
+
+    @callback
+    def async_add(self, coordinator: IndevoltCoordinator) -> None:
+        """Start managing the poll timer of a coordinator."""
+        self._coordinators.append(coordinator)
+        self._stagger()
+
+    @callback
+    def async_remove(self, coordinator: IndevoltCoordinator) -> None:
+        """Stop managing a coordinator and cancel its running poll."""
+        if coordinator not in self._coordinators:
+            return
+        self._coordinators.remove(coordinator)
+        self._phases.pop(coordinator, None)
+        poll = self._polls.pop(coordinator, None)
+        if poll is not None:
+            poll.cancel()
+        self._stagger()
+
+    def _stagger(self) -> None:
+        """Spread the devices evenly over their update interval."""
+        count = len(self._coordinators)
+        for index, coordinator in enumerate(self._coordinators):
+            self._phases[coordinator] = index / count
+
+    @callback
+    def async_schedule(self, coordinator: IndevoltCoordinator) -> CALLBACK_TYPE:
+        """Schedule the next poll of a coordinator at its phase and return a cancel callback."""
+        interval = coordinator.update_interval.total_seconds()
+        offset = self._phases.get(coordinator, 0) * interval
+        now = self.hass.loop.time()
+        # Next point in time after now that lies on the device's phase.
+        when = now + interval - (now - offset) % interval
+        handle = self.hass.loop.call_at(when, self._async_poll, coordinator)
+        return handle.cancel
+
+    @callback
+    def _async_poll(self, coordinator: IndevoltCoordinator) -> None:
+        """Start a poll of one device in its own task."""
+        coordinator._unsub_refresh = None
+        if coordinator in self._polls:
+            # The previous poll is still running: skip this slot.
+            _LOGGER.debug("Skipping poll of %s, previous poll still running", coordinator.name)
+            coordinator._schedule_refresh()
+            return
+
+        poll = self.hass.async_create_background_task(
+            coordinator.async_refresh(), f"{coordinator.name} poll"
+        )
+        self._polls[coordinator] = poll
+        poll.add_done_callback(lambda _: self._polls.pop(coordinator, None))
@@ -1,31 +1,827 @@
 import asyncio
 import aiohttp
+import bisect
+import contextlib
+import heapq
+import itertools
 import json
-from typing import Dict, Any, List
+import logging
+import random
+import time
+from collections import Counter, OrderedDict, deque
+from typing import TYPE_CHECKING, AsyncContextManager, AsyncIterator, Callable, Dict, Any, List, Sequence, Set, Tuple
+
+try:
+    # Home Assistant ships orjson; decode with it when available.
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    json_loads = json.loads
+
+from .tracing import PollTrace, trace_config
+
+if TYPE_CHECKING:
+    from .hub import DeviceRequestLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bound for the number of keys sent in one Indevolt.GetData request.
+# The real limit depends on the firmware and is learned at runtime.
+MAX_BATCH_SIZE = 32
+# Seconds after which a lowered batch limit is probed upwards again, and
+# after which keys the device did not answer are read again, in case the
+# firmware changed or only left them out for a while.
+BATCH_REPROBE_INTERVAL = 3600
+UNSUPPORTED_RETRY_INTERVAL = 3600
+
+# Timeouts in seconds. Connecting to a device on the LAN is fast or fails,
+# reading may take a little longer while the device is busy.
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+TOTAL_TIMEOUT = 15
+
+# Timeouts in seconds of the single request that probes an unreachable device.
+PROBE_CONNECT_TIMEOUT = 3
+PROBE_TOTAL_TIMEOUT = 5
+
+# Retries of a request that timed out or failed on the network, and the base
+# delay in seconds of the jittered exponential backoff between them.
+RETRY_ATTEMPTS = 2
+RETRY_BACKOFF = 0.5
+
+# Seconds an idle connection to the device is kept open for reuse.
+KEEPALIVE_TIMEOUT = 30
+
+# Seconds a resolved device address is cached.
+DNS_CACHE_TTL = 300
+
+# Heartbeat in seconds of the event stream and the source name sent in its
+# JSON-RPC frames.
+STREAM_HEARTBEAT = 30
+STREAM_SOURCE = "homeassistant-indevolt"
+
+# Seconds a read is served from the cache, and the number of distinct reads
+# kept per device. Long enough to absorb bursts of manual or
+# automation-triggered refreshes; the coordinator shortens it to below half
+# its update interval so polls always see fresh values.
+CACHE_TTL = 2
+CACHE_SIZE = 32
+
+# Key of the serial number register, the one value never normalized to a number.
+SERIAL_KEY = "0"
+
+# Number of distinct key groups whose request URL is kept per device.
+URL_CACHE_SIZE = 256
+
+# Request priorities, highest first. Waiting requests are admitted in this
+# order, and high-priority requests may use RESERVED_SLOTS connections on top
+# of the concurrency limit of the device.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+RESERVED_SLOTS = 1
+
+# Learned batch limits per device, keyed by base URL, so that a reloaded
+# config entry does not have to rediscover the limit of its device.
+_BATCH_LIMITS: Dict[str, "BatchLimit"] = {}
+
+
+class IndevoltAPIError(Exception):
+    """Raised when a request to the device fails."""
+
+
+class IndevoltTimeoutError(IndevoltAPIError):
+    """Raised when the device does not answer in time."""
+
+
+class IndevoltRequestRejected(IndevoltAPIError):
+    """Raised when the device answers but refuses the request."""
+
+
+class IndevoltDeviceUnavailable(IndevoltAPIError):
+    """Raised without a request while the circuit breaker of a device is open."""
+
+
+class IndevoltNotADevice(IndevoltAPIError):
+    """Raised when a host answers Indevolt.GetData without a serial number."""
+
+
+class IndevoltStreamUnsupported(IndevoltAPIError):
+    """Raised when the firmware does not offer an event stream."""
+
+
+class RequestStats:
+    """Counters and latency histogram of the requests sent to one device."""
+
+    # Upper bounds in milliseconds of the latency histogram buckets.
+    LATENCY_BUCKETS = (25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+    # Number of recent latencies kept for percentiles.
+    RECENT_SIZE = 100
+
+    def __init__(self):
+        self.requests = 0
+        self.bytes_received = 0
+        self.errors: Counter[str] = Counter()
+        self.latency_histogram = [0] * len(self.LATENCY_BUCKETS)
+        self.recent_latencies: deque[float] = deque(maxlen=self.RECENT_SIZE)
+        # Reads answered from the cache, and reads that joined one in flight.
+        self.cache_hits = 0
+        self.coalesced = 0
+
+    @property
+    def error_count(self) -> int:
+        """Return the number of failed requests of any type."""
+        return sum(self.errors.values())
+
+    @property
+    def timeout_count(self) -> int:
+        """Return the number of requests that timed out."""
+        return self.errors[IndevoltTimeoutError.__name__]
+
+    def record_request(self, latency: float, size: int) -> None:
+        """Count a completed request, its latency in seconds and its size in bytes."""
+        self.requests += 1
+        self.bytes_received += size
+        latency_ms = latency * 1000
+        self.latency_histogram[bisect.bisect_left(self.LATENCY_BUCKETS, latency_ms)] += 1
+        self.recent_latencies.append(latency_ms)
+
+    def record_error(self, err: Exception) -> None:
+        """Count a failed request by error type."""
+        self.requests += 1
+        self.errors[type(err).__name__] += 1
+
+    def latency_percentile(self, percentile: float) -> float | None:
+        """Return a percentile in milliseconds of the recent request latencies."""
+        if not self.recent_latencies:
+            return None
+        latencies = sorted(self.recent_latencies)
+        return latencies[min(len(latencies) - 1, int(len(latencies) * percentile))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the statistics as plain data."""
+        return {
+            "requests": self.requests,
+            "bytes_received": self.bytes_received,
+            "errors": dict(self.errors),
+            "latency_histogram_ms": {
+                str(bound): count for bound, count in zip(self.LATENCY_BUCKETS, self.latency_histogram)
+            },
+            "latency_p50_ms": self.latency_percentile(0.5),
+            "latency_p95_ms": self.latency_percentile(0.95),
+            "cache_hits": self.cache_hits,
+            "coalesced": self.coalesced,
+        }
+
+
+class CircuitBreaker:
+    """
+    Stops polling a device after repeated failures.
+    After FAILURE_THRESHOLD failed polls in a row the breaker opens and no
+    requests are made, except for a single probe every PROBE_INTERVAL seconds.
+    A successful probe closes the breaker again.
+    """
+
+    FAILURE_THRESHOLD = 3
+    PROBE_INTERVAL = 120
+
+    def __init__(self):
+        self.failures = 0
+        self.opened_at: float | None = None
+        self.next_probe = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """Return whether polling of the device is suspended."""
+        return self.opened_at is not None
+
+    def probe_due(self) -> bool:
+        """Return whether an open breaker should probe the device now."""
+        return time.monotonic() >= self.next_probe
+
+    def record_success(self) -> None:
+        """Close the breaker after the device answered."""
+        if self.opened_at is not None:
+            _LOGGER.info("Device is reachable again after %.0f s", time.monotonic() - self.opened_at)
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        """Count a failed poll or probe and open the breaker at the threshold."""
+        self.failures += 1
+        if self.opened_at is None and self.failures >= self.FAILURE_THRESHOLD:
+            self.opened_at = time.monotonic()
+        if self.opened_at is not None:
+            self.next_probe = time.monotonic() + self.PROBE_INTERVAL
+
+
+class BatchLimit:
+    """
+    Learns how many keys a device answers per request.
+    Batches have the maximum size until the device rejects one. From then on
+    the size lies halfway between the largest batch answered in full and the
+    smallest one rejected, so it settles on the actual limit of the device
+    instead of a power of two below it. BATCH_REPROBE_INTERVAL seconds after
+    the limit was last lowered, the upper bound is lifted again, so a limit
+    learned from a rejection that was not about the size recovers.
+    """
+
+    def __init__(self):
+        self.accepted = 0
+        self.rejected: int | None = None
+        self.lowered_at = 0.0
+
+    @property
+    def size(self) -> int:
+        """Return the number of keys to send per request."""
+        if self.rejected is None:
+            return MAX_BATCH_SIZE
+        return max(1, (self.accepted + self.rejected) // 2)
+
+    def record_accepted(self, size: int) -> None:
+        """Remember a batch the device answered in full."""
+        self.accepted = max(self.accepted, size)
+        if self.rejected is None:
+            return
+        if self.rejected <= size:
+            self.rejected = size + 1
+        elif time.monotonic() - self.lowered_at >= BATCH_REPROBE_INTERVAL:
+            _LOGGER.debug("Probing a batch limit above %s keys again", self.accepted)
+            self.rejected = MAX_BATCH_SIZE + 1
+            self.lowered_at = time.monotonic()
+
+    def record_rejected(self, size: int) -> None:
+        """Remember a batch the device refused with a client error or an undecodable answer."""
+        if self.rejected is None or size < self.rejected:
+            _LOGGER.debug("Batch of %s keys rejected, lowering the batch limit", size)
+            self.rejected = size
+            self.lowered_at = time.monotonic()
+        self.accepted = min(self.accepted, size - 1)
+
+    def record_truncated(self, size: int) -> None:
+        """Remember that the device answered only the first size keys of a batch."""
+        self.accepted = size
+        self.rejected = size + 1
+        self.lowered_at = time.monotonic()
+
+
+class AdaptiveLimiter:
+    """
+    Priority semaphore whose limit adapts to the health of the device.
+    The limit is halved when requests time out or fail and grows back by one
+    after a run of successful requests, up to the configured maximum.
+    Waiting requests get a slot highest priority first, in arrival order
+    within a priority, and high-priority requests may use the reserved slots
+    above the limit, so they never wait behind a slow normal request.
+    """
+
+    # Successful requests needed before the limit is raised again.
+    RECOVERY_STREAK = 10
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self._active = 0
+        self._streak = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+
+    @contextlib.asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_NORMAL) -> AsyncIterator[None]:
+        """Hold a request slot, waiting for it in priority order."""
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._wake()
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted just before the cancellation arrived: hand the slot back.
+            if not future.cancelled():
+                self._release()
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    @property
+    def free(self) -> int:
+        """Return how many more requests would get a slot without waiting."""
+        return max(0, self.limit - self._active - len(self._waiters))
+
+    def _capacity(self, priority: int) -> int:
+        return self.limit + RESERVED_SLOTS if priority == PRIORITY_HIGH else self.limit
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        """Grant free slots to the first waiters, skipping the ones that were cancelled."""
+        while self._waiters:
+            priority, _, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if self._active >= self._capacity(priority):
+                return
+            heapq.heappop(self._waiters)
+            self._active += 1
+            future.set_result(None)
+
+    def record_success(self) -> None:
+        """Count a successful request and raise the limit after a streak."""
+        self._streak += 1
+        if self._streak >= self.RECOVERY_STREAK and self.limit < self.max_limit:
+            self.limit += 1
+            self._streak = 0
+            self._wake()
+
+    def record_failure(self) -> None:
+        """Halve the limit after a timeout or network error."""
+        self._streak = 0
+        if self.limit > 1:
+            self.limit = max(1, self.limit // 2)
+            _LOGGER.debug("Lowering request concurrency to %s", self.limit)
+
+
+def normalize_values(values: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn register values some firmware sends as numeric strings into numbers."""
+    for key, value in values.items():
+        if type(value) is str and key != SERIAL_KEY:
+            try:
+                values[key] = int(value)
+            except ValueError:
+                try:
+                    values[key] = float(value)
+                except ValueError:
+                    pass
+    return values
+
+
+class ReadCache:
+    """Results of recent reads by URL, expiring after a TTL and evicted least recently used first."""
+
+    def __init__(self, ttl: float = CACHE_TTL, size: int = CACHE_SIZE):
+        self.ttl = ttl
+        self.size = size
+        self._entries: OrderedDict[str, tuple[float, Dict[str, Any]]] = OrderedDict()
+
+    def get(self, url: str) -> Dict[str, Any] | None:
+        """Return a copy of a fresh cached result."""
+        entry = self._entries.get(url)
+        if entry is None:
+            return None
+        expires, result = entry
+        if expires <= time.monotonic():
+            del self._entries[url]
+            return None
+        self._entries.move_to_end(url)
+        return dict(result)
+
+    def put(self, url: str, result: Dict[str, Any]) -> None:
+        self._entries[url] = (time.monotonic() + self.ttl, dict(result))
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
 
 class IndevoltAPI:
     """Handles all HTTP communication with Indevolt devices"""
-    
-    def __init__(self, host: str, port: int, session: aiohttp.ClientSession):
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        session: aiohttp.ClientSession | None = None,
+        max_concurrency: int = 1,
+        request_limiter: "DeviceRequestLimiter | None" = None,
+        cache_ttl: float = CACHE_TTL,
+    ):
         self.host = host
         self.port = port
-        self.session = session
         self.base_url = f"http://{host}:{port}/rpc"
-        self.timeout = aiohttp.ClientTimeout(total=60)
-    
-    async def fetch_data(self, keys: List[str]) -> Dict[str, Any]:
-        """Fetch raw JSON data from the device"""
-        config_param = json.dumps({"t": keys}).replace(" ", "")
-        url = f"{self.base_url}/Indevolt.GetData?config={config_param}"
-        
-        try:
-            async with self.session.post(url, timeout=self.timeout) as response:
-                if response.status != 200:
-                    raise Exception(f"HTTP status error: {response.status}")
-                return await response.json()
-                
-        except asyncio.TimeoutError:
-            raise Exception("Indevolt.GetData Request timed out")
+        self.timeout = aiohttp.ClientTimeout(
+            total=TOTAL_TIMEOUT, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT
+        )
+        self.probe_timeout = aiohttp.ClientTimeout(
+            total=PROBE_TOTAL_TIMEOUT, connect=PROBE_CONNECT_TIMEOUT
+        )
+        self.limiter = AdaptiveLimiter(max_concurrency)
+        self.breaker = CircuitBreaker()
+        self.stats = RequestStats()
+        # Optional limit shared with other devices, acquired per request.
+        self.request_limiter = request_limiter
+        # Recent reads, and reads in flight that identical reads wait for.
+        self.cache = ReadCache(cache_ttl)
+        # Registered on the first batched read, so that addresses only probed
+        # by discovery leave no limit behind.
+        self._batch_limit: BatchLimit | None = None
+        # Keys the firmware answers nothing for, left out of reads until the
+        # time they map to.
+        self.unsupported: Dict[int, float] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Request URLs by key group, built once.
+        self._urls: Dict[tuple, str] = {}
+        # Trace of the poll in progress, set by the coordinator while tracing.
+        self.trace: PollTrace | None = None
+        # Without a session from the caller, the API owns a dedicated
+        # keep-alive session for the device, created on first use.
+        self._session = session
+        self._owns_session = session is None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """Return the HTTP session, creating the dedicated one if needed."""
+        if self._session is None or self._session.closed:
+            # Connections for the request limit and its reserved slots, and
+            # one more for the event stream.
+            connector = aiohttp.TCPConnector(
+                limit=self.limiter.max_limit + RESERVED_SLOTS + 1,
+                limit_per_host=self.limiter.max_limit + RESERVED_SLOTS + 1,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                use_dns_cache=True,
+                ttl_dns_cache=DNS_CACHE_TTL,
+            )
+            # The trace callbacks only act on requests of a traced poll.
+            self._session = aiohttp.ClientSession(
+                connector=connector, timeout=self.timeout, trace_configs=[trace_config()]
+            )
+            self._owns_session = True
+        return self._session
+
+    @session.setter
+    def session(self, session: aiohttp.ClientSession) -> None:
+        self._session = session
+        self._owns_session = False
+
+    async def async_close(self) -> None:
+        """Cancel the reads in flight and close the dedicated session and its pooled connections."""
+        for future in list(self._inflight.values()):
+            future.cancel()
+        self._inflight.clear()
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @property
+    def batch_limit(self) -> BatchLimit:
+        """Return the batch limit learned for the device."""
+        if self._batch_limit is None:
+            self._batch_limit = _BATCH_LIMITS.setdefault(self.base_url, BatchLimit())
+        return self._batch_limit
+
+    @property
+    def batch_size(self) -> int:
+        """Return the largest number of keys currently sent per request."""
+        return self.batch_limit.size
+
+    async def fetch_data(
+        self, keys: List[str], retries: int = RETRY_ATTEMPTS, priority: int = PRIORITY_NORMAL
+    ) -> Dict[str, Any]:
+        """
+        Fetch raw JSON data from the device, retrying transient failures.
+        Reads answered within the cache TTL are served from the cache, and a
+        read identical to one in flight waits for its answer instead of
+        sending another request.
+        """
+        if self.trace is None:
+            url = self._get_data_url(keys)
+        else:
+            start = time.monotonic()
+            url = self._get_data_url(keys)
+            self.trace.add("url", time.monotonic() - start)
+
+        cached = self.cache.get(url)
+        if cached is not None:
+            self.stats.cache_hits += 1
+            return cached
+        future = self._inflight.get(url)
+        if future is None:
+            future = self._inflight[url] = asyncio.ensure_future(self._fetch_url(url, retries, priority))
+            future.add_done_callback(lambda done: self._fetch_done(url, done))
+        else:
+            self.stats.coalesced += 1
+        # Shielded, so a cancelled caller does not cancel the read for the others.
+        return dict(await asyncio.shield(future))
+
+    def _get_data_url(self, keys: Sequence[int]) -> str:
+        """Return the Indevolt.GetData URL of a key group, building it on first use."""
+        group = tuple(keys)
+        url = self._urls.get(group)
+        if url is None:
+            if len(self._urls) >= URL_CACHE_SIZE:
+                self._urls.clear()
+            joined = ",".join(str(key) for key in group)
+            url = self._urls[group] = f'{self.base_url}/Indevolt.GetData?config={{"t":[{joined}]}}'
+        return url
+
+    def _fetch_done(self, url: str, future: asyncio.Future) -> None:
+        """Forget a finished read, caching its result."""
+        self._inflight.pop(url, None)
+        if future.cancelled():
+            return
+        # Retrieve the exception even when every waiting caller was cancelled.
+        if future.exception() is None:
+            self.cache.put(url, future.result())
+
+    async def _fetch_url(self, url: str, retries: int, priority: int) -> Dict[str, Any]:
+        for attempt in range(retries + 1):
+            try:
+                return await self._request(url, self.timeout, priority=priority)
+            except IndevoltRequestRejected:
+                raise
+            except IndevoltAPIError as err:
+                if attempt == retries:
+                    raise
+                delay = random.uniform(0, RETRY_BACKOFF * 2 ** attempt)
+                _LOGGER.debug("Retrying %s in %.2f s: %s", self.host, delay, err)
+                await asyncio.sleep(delay)
+
+    async def _request(
+        self,
+        url: str,
+        timeout: aiohttp.ClientTimeout,
+        method: str = "Indevolt.GetData",
+        priority: int = PRIORITY_NORMAL,
+        shared: bool = True,
+    ) -> Dict[str, Any]:
+        """Send one request to the device and return its JSON object."""
+        trace = self.trace
+        timings = None if trace is None else {"queued": time.monotonic()}
+        try:
+            async with self.limiter.slot(priority), self._request_slot(priority, shared):
+                start = time.monotonic()
+                async with self.session.post(url, timeout=timeout, trace_request_ctx=timings) as response:
+                    if 400 <= response.status < 500:
+                        raise IndevoltRequestRejected(f"HTTP status error: {response.status}")
+                    if response.status != 200:
+                        # A server error says nothing about the request, so it is retried.
+                        raise IndevoltAPIError(f"HTTP status error: {response.status}")
+                    body = await response.read()
+                latency = time.monotonic() - start
+            self.limiter.record_success()
+            result = json_loads(body)
+
+        except asyncio.TimeoutError as err:
+            self.limiter.record_failure()
+            error = IndevoltTimeoutError(f"{method} Request timed out")
+            self._record_error(error, trace, timings)
+            raise error from err
         except aiohttp.ClientError as err:
-            raise Exception(f"Indevolt.GetData Network error: {err}")
+            self.limiter.record_failure()
+            error = IndevoltAPIError(f"{method} Network error: {err}")
+            self._record_error(error, trace, timings)
+            raise error from err
+        except ValueError as err:
+            error = IndevoltRequestRejected(f"{method} Invalid response: {err}")
+            self._record_error(error, trace, timings)
+            raise error from err
+        except IndevoltAPIError as err:
+            self._record_error(err, trace, timings)
+            raise
+
+        self.stats.record_request(latency, len(body))
+        if not isinstance(result, dict):
+            error = IndevoltRequestRejected(f"{method} Unexpected response format")
+            if timings is not None:
+                trace.add_request(timings, start + latency, error=str(error))
+            raise error
+        result = normalize_values(result)
+        if timings is not None:
+            trace.add_request(timings, start + latency, time.monotonic(), keys=len(result))
+        return result
+
+    def _record_error(self, error: IndevoltAPIError, trace: PollTrace | None, timings: Dict[str, float] | None) -> None:
+        """Count a failed request, recording it in the poll trace while tracing."""
+        self.stats.record_error(error)
+        if trace is not None and timings is not None:
+            trace.add_request(timings, time.monotonic(), error=str(error))
+
+    def _request_slot(self, priority: int, shared: bool) -> AsyncContextManager[None]:
+        """Return the slot of the optional limit shared with other devices."""
+        if self.request_limiter is None:
+            return contextlib.nullcontext()
+        return self.request_limiter.slot(priority, shared)
+
+    async def probe(self, keys: List[int] = (0,), shared: bool = True) -> Dict[str, Any]:
+        """
+        Read a few keys with one short request, without retries, checking that
+        the device answers. Without shared, the request only uses the device's
+        own slot of the limit shared with other devices.
+        """
+        return await self._request(self._get_data_url(keys), self.probe_timeout, shared=shared)
+
+    async def set_data(self, values: Dict[int, int]) -> None:
+        """
+        Write registers with Indevolt.SetData.
+        Registers with consecutive addresses are written together in one
+        request, as a multiple-register write starting at the first one.
+        Writes are not retried, are sent with high priority, and the read
+        cache is cleared afterwards so the next read sees the new values.
+        """
+        try:
+            for start, run in self._register_runs(values):
+                config_param = json.dumps({"f": 16, "t": start, "v": run}).replace(" ", "")
+                await self._request(
+                    f"{self.base_url}/Indevolt.SetData?config={config_param}",
+                    self.timeout,
+                    "Indevolt.SetData",
+                    PRIORITY_HIGH,
+                )
+        finally:
+            self.cache.clear()
+
+    @staticmethod
+    def _register_runs(values: Dict[int, int]) -> List[tuple[int, List[int]]]:
+        """Group register values into runs of consecutive addresses."""
+        runs: List[tuple[int, List[int]]] = []
+        for register in sorted(values):
+            if runs and runs[-1][0] + len(runs[-1][1]) == register:
+                runs[-1][1].append(values[register])
+            else:
+                runs.append((register, [values[register]]))
+        return runs
+
+    async def stream(self, keys: List[int], on_data: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        Receive register values over the RPC WebSocket until it closes.
+        The stream subscribes with an Indevolt.GetData call for the keys and
+        passes the register values of every result or notification frame to
+        on_data. Raises IndevoltStreamUnsupported when the firmware does not
+        accept the WebSocket handshake.
+        """
+        url = f"ws://{self.host}:{self.port}/rpc"
+        try:
+            async with self.session.ws_connect(
+                url, heartbeat=STREAM_HEARTBEAT, timeout=self.probe_timeout.total
+            ) as ws:
+                await ws.send_json({
+                    "id": 1,
+                    "src": STREAM_SOURCE,
+                    "method": "Indevolt.GetData",
+                    "params": {"t": keys},
+                })
+                async for message in ws:
+                    if message.type != aiohttp.WSMsgType.TEXT:
+                        break
+                    data = self._stream_values(message.data)
+                    if data:
+                        on_data(data)
+
+        except aiohttp.WSServerHandshakeError as err:
+            raise IndevoltStreamUnsupported(f"Event stream not available: {err.status}") from err
+        except asyncio.TimeoutError as err:
+            raise IndevoltTimeoutError("Event stream connection timed out") from err
+        except aiohttp.ClientError as err:
+            raise IndevoltAPIError(f"Event stream network error: {err}") from err
+
+    @staticmethod
+    def _stream_values(frame: str) -> Dict[str, Any]:
+        """Return the register values of a JSON-RPC result or notification frame."""
+        try:
+            payload = json_loads(frame)
+        except ValueError:
+            return {}
+        if not isinstance(payload, dict):
+            return {}
+        values = payload.get("result", payload.get("params"))
+        if not isinstance(values, dict):
+            return {}
+        return normalize_values({key: value for key, value in values.items() if key.isdigit()})
+
+    async def fetch_batched(self, keys: List[int], priorities: Dict[int, int] | None = None) -> Dict[str, Any]:
+        """
+        Fetch many keys with as few requests as the device accepts.
+        Keys are sent in batches of the learned batch size. When there are
+        more batches than free request slots, each priority in priorities
+        (normal for keys not in it) gets its own set of batches, so a
+        high-priority key never waits for the answer of a slower batch.
+        Batches the device rejects or truncates are split and retried,
+        lowering the learned limit, and keys the device answers nothing for
+        are left out from then on. Batches run concurrently within the limit
+        of the request limiter, so firmware that only accepts single keys is
+        polled in parallel. While the circuit breaker is open, only a periodic
+        probe is sent.
+        """
+        if self.breaker.is_open:
+            if not self.breaker.probe_due():
+                raise IndevoltDeviceUnavailable(
+                    f"{self.host} is unreachable, next probe in "
+                    f"{self.breaker.next_probe - time.monotonic():.0f} s"
+                )
+            try:
+                # A device that is likely offline keeps its timeouts out of the shared slots.
+                await self.probe(shared=False)
+            except IndevoltRequestRejected:
+                pass
+            except IndevoltAPIError:
+                self.breaker.record_failure()
+                raise
+
+        if self.unsupported:
+            now = time.monotonic()
+            for key in [key for key, until in self.unsupported.items() if until <= now]:
+                del self.unsupported[key]
+            keys = [key for key in keys if key not in self.unsupported]
+        try:
+            data = await self._fetch_batches(keys, priorities)
+        except IndevoltRequestRejected:
+            self.breaker.record_success()
+            raise
+        except IndevoltAPIError:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+
+    async def _fetch_batches(self, keys: List[int], priorities: Dict[int, int] | None = None) -> Dict[str, Any]:
+        """
+        Fetch keys in batches of the learned batch size, batching each
+        priority separately unless every batch gets a request slot at once.
+        """
+        size = self.batch_size
+        groups: Dict[int, List[int]] = {}
+        for key in keys:
+            priority = priorities.get(key, PRIORITY_NORMAL) if priorities else PRIORITY_NORMAL
+            groups.setdefault(priority, []).append(key)
+        if len(groups) > 1 and -(-len(keys) // size) <= self.limiter.free:
+            # No batch would wait for a slot: batch the priorities together,
+            # highest first, each batch going with its highest priority.
+            ordered = [(priority, key) for priority, group in sorted(groups.items()) for key in group]
+            batches = [
+                (ordered[start][0], [key for _, key in ordered[start:start + size]])
+                for start in range(0, len(ordered), size)
+            ]
+        else:
+            batches = [
+                (priority, group[start:start + size])
+                for priority, group in sorted(groups.items())
+                for start in range(0, len(group), size)
+            ]
+        if len(batches) == 1:
+            return await self._fetch_batch(batches[0][1], batches[0][0])
+
+        results = await asyncio.gather(
+            *(self._fetch_batch(batch, priority) for priority, batch in batches),
+            return_exceptions=True,
+        )
+        data: Dict[str, Any] = {}
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+            data.update(result)
+        return data
+
+    async def _fetch_batch(self, keys: List[int], priority: int = PRIORITY_NORMAL) -> Dict[str, Any]:
+        """
+        Fetch one batch.
+        Only a client error status or an undecodable answer lowers the batch
+        limit; the batch is then fetched again in batches of the lowered size.
+        An answer without any of the keys means they are unsupported once the
+        device is known to answer batches of that size, and is split to find
+        out otherwise. Unsupported keys are returned without a value, so the
+        last one read is not kept.
+        """
+        limit = self.batch_limit
+        try:
+            result = await self.fetch_data(keys, priority=priority)
+        except IndevoltRequestRejected:
+            if len(keys) == 1:
+                raise
+            limit.record_rejected(len(keys))
+            return await self._fetch_batches(keys, dict.fromkeys(keys, priority))
+
+        if not any(str(key) in result for key in keys):
+            if len(keys) == 1 or len(keys) <= limit.accepted:
+                return self._mark_unsupported(keys)
+            half = len(keys) // 2
+            result = await self._fetch_batch(keys[:half], priority)
+            result.update(await self._fetch_batch(keys[half:], priority))
+            return result
+
+        # Keys missing before the last answered key were skipped by the
+        # device, so it does not support them. Keys missing after it were
+        # either cut off by a truncated answer or are unsupported as well.
+        answered = max(index for index, key in enumerate(keys) if str(key) in result) + 1
+        skipped = [key for key in keys[:answered] if str(key) not in result]
+        if skipped:
+            result.update(self._mark_unsupported(skipped))
+        rest = keys[answered:]
+        retried = await self._fetch_batches(rest, dict.fromkeys(rest, priority)) if rest else {}
+        if any(value is not None for value in retried.values()):
+            limit.record_truncated(answered)
+        else:
+            limit.record_accepted(len(keys))
+        result.update(retried)
+        return result
 
+    def _mark_unsupported(self, keys: List[int]) -> Dict[str, None]:
+        """Leave keys the device answers nothing for out of reads for a while and return them without a value."""
+        _LOGGER.debug("%s does not answer keys %s, not reading them for a while", self.host, keys)
+        until = time.monotonic() + UNSUPPORTED_RETRY_INTERVAL
+        for key in keys:
+            self.unsupported[key] = until
+        return dict.fromkeys(map(str, keys))
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+"""Number entities writing numeric registers of Indevolt devices."""
+
+from dataclasses import dataclass
+from typing import Final
+
+from homeassistant.components.number import NumberEntity, NumberEntityDescription, NumberMode
+from homeassistant.const import PERCENTAGE
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .indevolt_api import IndevoltAPIError
+from .sensor import device_info
+
+
+@dataclass(frozen=True, kw_only=True)
+class IndevoltNumberEntityDescription(NumberEntityDescription):
+    """Entity description of a numeric register that can be written."""
+    name: str = ""
+    entity_category: EntityCategory | None = EntityCategory.CONFIG
+
+
+NUMBERS: Final = (
+    IndevoltNumberEntityDescription(
+        key="6105",
+        name="Emergency power supply",
+        native_unit_of_measurement=PERCENTAGE,
+        native_min_value=0,
+        native_max_value=100,
+        native_step=1,
+        mode=NumberMode.SLIDER
+    ),
+)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """
+    Set up the number platform for the registers the device generation has.
+    Registers without a verified write address get no entity.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        IndevoltNumberEntity(coordinator=coordinator, description=description)
+        for description in NUMBERS
+        if description.key in coordinator.registers
+        and coordinator.registers[description.key].write_key is not None
+    )
+
+
+class IndevoltNumberEntity(CoordinatorEntity, NumberEntity):
+    """Represents a writable numeric register of an Indevolt device."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, description: IndevoltNumberEntityDescription):
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        sn=coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info(coordinator)
+        self._slot = coordinator.table.slots[description.key]
+        self._coefficient = coordinator.registers[description.key].coefficient
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates and request polling of our register."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_register_key(self.entity_description.key))
+
+    @property
+    def native_value(self) -> float | None:
+        """Return the current value of the register in its native unit."""
+        return self.coordinator.values[self._slot]
+
+    async def async_set_native_value(self, value: float) -> None:
+        """Write the raw register value of a native value."""
+        try:
+            await self.coordinator.async_write(self.entity_description.key, round(value / self._coefficient))
+        except IndevoltAPIError as err:
+            raise HomeAssistantError(f"Failed to set {self.entity_description.name}: {err}") from err
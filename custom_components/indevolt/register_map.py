@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+"""
+Register map of the device generations, loaded from the JSON files in registers/.
+
+common.json defines every known register once. Each genN.json lists the
+registers of a generation in entity order and overrides fields of some of
+them, and can overlay further overrides per firmware version. models.json
+maps model names to their generation, with optional overrides per model.
+An override is merged into the register definition; an override of null
+removes the register, and an override of an unlisted key adds it.
+A register's request priority is "high", "normal" or "low", by default
+normal for fast registers and low for slow and static ones. A register is
+only writable once its verified Indevolt.SetData address is set as
+"write_key".
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from homeassistant.components.sensor import SensorDeviceClass, SensorStateClass
+from homeassistant.core import HomeAssistant
+
+from .const import POLL_TIER_FAST
+from .decoders import RegisterTable
+from .indevolt_api import PRIORITY_HIGH, PRIORITY_LOW, PRIORITY_NORMAL
+from .sensor import IndevoltSensorEntityDescription
+
+REGISTERS_DIR = Path(__file__).parent / "registers"
+
+PRIORITIES = {"high": PRIORITY_HIGH, "normal": PRIORITY_NORMAL, "low": PRIORITY_LOW}
+
+# Parsed files and built register maps, shared by all config entries.
+_FILES: Dict[str, Any] = {}
+_MAPS: Dict[Tuple[int, str | None, str | None], RegisterMap] = {}
+
+
+@dataclass(frozen=True)
+class RegisterMap:
+    """Sensor descriptions of the registers of one device, and their compiled table."""
+
+    generation: int
+    descriptions: Dict[str, IndevoltSensorEntityDescription]
+    table: RegisterTable
+
+
+def _load_file(name: str) -> Any:
+    """Parse a file of the registers directory once."""
+    if name not in _FILES:
+        with open(REGISTERS_DIR / name, encoding="utf-8") as file:
+            _FILES[name] = json.load(file)
+    return _FILES[name]
+
+
+def _describe(key: str, spec: Dict[str, Any]) -> IndevoltSensorEntityDescription:
+    """Build the sensor description of a register definition."""
+    poll_tier = spec.get("poll_tier", POLL_TIER_FAST)
+    priority = spec.get("priority", "normal" if poll_tier == POLL_TIER_FAST else "low")
+    return IndevoltSensorEntityDescription(
+        key=key,
+        name=spec["name"],
+        poll_tier=poll_tier,
+        priority=PRIORITIES[priority],
+        write_key=spec.get("write_key"),
+        coefficient=spec.get("coefficient", 1.0),
+        deadband=spec.get("deadband", 0),
+        native_unit_of_measurement=spec.get("unit"),
+        device_class=SensorDeviceClass(spec["device_class"]) if "device_class" in spec else None,
+        state_class=SensorStateClass(spec["state_class"]) if "state_class" in spec else None,
+        state_mapping={int(raw): state for raw, state in spec.get("states", {}).items()},
+    )
+
+
+def load_models() -> Dict[str, int]:
+    """Return the generation of every known model."""
+    return {model: spec["generation"] for model, spec in _load_file("models.json").items()}
+
+
+def load_register_map(gen: int, model: str | None = None, firmware: str | None = None) -> RegisterMap:
+    """
+    Return the register map of a generation with the overrides of a model
+    and firmware version applied, building it on first use. Does file I/O,
+    so call it from an executor within Home Assistant.
+    """
+    cache_key = (gen, model, firmware)
+    if cache_key in _MAPS:
+        return _MAPS[cache_key]
+
+    common = _load_file("common.json")["registers"]
+    generation = _load_file(f"gen{gen}.json")
+    specs: Dict[str, Dict[str, Any] | None] = {key: common[key] for key in generation["registers"]}
+    overlays: List[Dict[str, Any]] = [generation.get("overrides", {})]
+    if model is not None:
+        overlays.append(_load_file("models.json").get(model, {}).get("overrides", {}))
+    if firmware is not None:
+        overlays.append(generation.get("firmware", {}).get(firmware, {}))
+    for overlay in overlays:
+        for key, override in overlay.items():
+            if override is None:
+                specs.pop(key, None)
+            else:
+                specs[key] = {**(specs.get(key) or common.get(key, {})), **override}
+
+    descriptions = {key: _describe(key, spec) for key, spec in specs.items()}
+    register_map = _MAPS[cache_key] = RegisterMap(gen, descriptions, RegisterTable(descriptions))
+    return register_map
+
+
+async def async_get_register_map(
+    hass: HomeAssistant, gen: int, model: str | None = None, firmware: str | None = None
+) -> RegisterMap:
+    """Return a register map, loading its files in the executor on first use."""
+    register_map = _MAPS.get((gen, model, firmware))
+    if register_map is None:
+        register_map = await hass.async_add_executor_job(load_register_map, gen, model, firmware)
+    return register_map
+
+
+async def async_get_models(hass: HomeAssistant) -> Dict[str, int]:
+    """Return the generation of every known model, loading models.json in the executor on first use."""
+    if "models.json" in _FILES:
+        return load_models()
+    return await hass.async_add_executor_job(load_models)
+
+
+async def async_get_generation_keys(hass: HomeAssistant) -> Dict[int, List[str]]:
+    """Return, per generation, the registers no other generation has."""
+    generations = sorted(set((await async_get_models(hass)).values()))
+    keys = {
+        gen: set((await async_get_register_map(hass, gen)).descriptions) for gen in generations
+    }
+    return {
+        gen: sorted(own - set().union(*(other for other_gen, other in keys.items() if other_gen != gen)), key=int)
+        for gen, own in keys.items()
+    }
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+"""Select entities writing enumerated registers of Indevolt devices."""
+
+from dataclasses import dataclass
+from typing import Final
+
+from homeassistant.components.select import SelectEntity, SelectEntityDescription
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .indevolt_api import IndevoltAPIError
+from .sensor import device_info
+
+
+@dataclass(frozen=True, kw_only=True)
+class IndevoltSelectEntityDescription(SelectEntityDescription):
+    """Entity description of a register set from its enumerated states."""
+    name: str = ""
+    entity_category: EntityCategory | None = EntityCategory.CONFIG
+
+
+# Options and their raw values come from the register's sensor description.
+SELECTS: Final = (
+    IndevoltSelectEntityDescription(
+        key="7101",
+        name="Working mode"
+    ),
+)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """
+    Set up the select platform for the registers the device generation has.
+    Registers without a verified write address get no entity.
+    """
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(
+        IndevoltSelectEntity(coordinator=coordinator, description=description)
+        for description in SELECTS
+        if description.key in coordinator.registers
+        and coordinator.registers[description.key].write_key is not None
+    )
+
+
+class IndevoltSelectEntity(CoordinatorEntity, SelectEntity):
+    """Represents a writable enumerated register of an Indevolt device."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, description: IndevoltSelectEntityDescription):
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        sn=coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info(coordinator)
+        self._slot = coordinator.table.slots[description.key]
+        self._attr_options = coordinator.table.options[self._slot]
+        self._raw_values = {
+            state: raw for raw, state in coordinator.registers[description.key].state_mapping.items()
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates and request polling of our register."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_register_key(self.entity_description.key))
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the current state of the register."""
+        return self.coordinator.values[self._slot]
+
+    async def async_select_option(self, option: str) -> None:
+        """Write the raw value of the selected state."""
+        try:
+            await self.coordinator.async_write(self.entity_description.key, self._raw_values[option])
+        except IndevoltAPIError as err:
+            raise HomeAssistantError(f"Failed to set {self.entity_description.name}: {err}") from err
@@ -1,15 +1,21 @@
-from homeassistant.components.sensor import SensorEntity, SensorDeviceClass, SensorEntityDescription, SensorStateClass
+from homeassistant.components.sensor import RestoreSensor, SensorEntity, SensorDeviceClass, SensorEntityDescription, SensorStateClass
+from homeassistant.core import callback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
-from .utils import get_device_gen
-from .const import DOMAIN
+from .const import (
+    DOMAIN,
+    AGGREGATE_STATISTICS,
+    AGGREGATE_WINDOWS,
+    POLL_TIER_FAST,
+)
+from .indevolt_api import PRIORITY_NORMAL
 from dataclasses import dataclass, field
-from typing import Final
+from typing import Any, Callable, Final
 from homeassistant.const import (
     UnitOfEnergy,
-    UnitOfPower,
-    PERCENTAGE
+    UnitOfInformation,
+    UnitOfTime
 )
 import logging
 
@@ -22,329 +28,161 @@ class IndevoltSensorEntityDescription(SensorEntityDescription):
     """Custom entity description class for Indevolt sensors."""
     name: str = ""
     coefficient: float = 1.0
+    poll_tier: str = POLL_TIER_FAST
+    # Raw value changes smaller than this are not written to the state machine.
+    deadband: float = 0
+    # Priority of the register's requests, one of the PRIORITY_* of indevolt_api.
+    priority: int = PRIORITY_NORMAL
+    # Address Indevolt.SetData sets the register at, once verified against
+    # the firmware. Registers without one are read-only.
+    write_key: str | None = None
 
     state_mapping: dict[int, str] = field(default_factory=dict)
     translation_key: str | None = None
     entity_category: EntityCategory | None = None
 
-SENSORS_GEN1: Final = (
-    IndevoltSensorEntityDescription(
-        key="1664",
-        name="DC Input Power1",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1665",
-        name="DC Input Power2",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="2108",
-        name="Total AC Output Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1502",
-        name="Daily Production",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="1505",
-        name="Cumulative Production",
-        coefficient=0.001,
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="2101",
-        name="Total AC Input Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="2107",
-        name="Total AC Input Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="1501",
-        name="Total DC Output Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6000",
-        name="Battery Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6002",
-        name="Battery SOC",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.BATTERY,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6105",
-        name="Emergency power supply",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.BATTERY,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6004",
-        name="Battery Daily Charging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6005",
-        name="Battery Daily Discharging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6006",
-        name="Battery Total Charging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6007",
-        name="Battery Total Discharging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="21028",
-        name="Meter Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="7101",
-        name="Working mode",
-        state_mapping={
-            0: "Outdoor Portable",
-            1: "Self-consumed Prioritized",
-            5: "Charge/Discharge Schedule"
-        },
-        device_class=SensorDeviceClass.ENUM
-    ),
-    IndevoltSensorEntityDescription(
-        key="6001",
-        name="Battery Charge/Discharge State",
-        state_mapping={
-            1000: "Static",
-            1001: "Charging",
-            1002: "Discharging"
-        },
-        device_class=SensorDeviceClass.ENUM
-    ),
-    IndevoltSensorEntityDescription(
-        key="7120",
-        name="Meter Connection Status",
-        state_mapping={
-            1000: "ON",
-            1001: "OFF"
-        },
-        device_class=SensorDeviceClass.ENUM
+@dataclass(frozen=True, kw_only=True)
+class IndevoltDiagnosticSensorEntityDescription(SensorEntityDescription):
+    """Entity description of a sensor reporting polling statistics."""
+    name: str = ""
+    value_fn: Callable[[Any], Any]
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+
+
+DIAGNOSTIC_SENSORS: Final = (
+    IndevoltDiagnosticSensorEntityDescription(
+        key="last_success_time",
+        name="Last successful poll",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.last_success_time
+    ),
+    IndevoltDiagnosticSensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.poll_duration
+    ),
+    IndevoltDiagnosticSensorEntityDescription(
+        key="poll_requests",
+        name="Requests per poll",
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.poll_requests
+    ),
+    IndevoltDiagnosticSensorEntityDescription(
+        key="request_latency_p95",
+        name="Request latency (95th percentile)",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.api.stats.latency_percentile(0.95)
+    ),
+    IndevoltDiagnosticSensorEntityDescription(
+        key="bytes_received",
+        name="Bytes received",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.api.stats.bytes_received
+    ),
+    IndevoltDiagnosticSensorEntityDescription(
+        key="request_errors",
+        name="Request errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.api.stats.error_count
+    ),
+    IndevoltDiagnosticSensorEntityDescription(
+        key="request_timeouts",
+        name="Request timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=False,
+        value_fn=lambda coordinator: coordinator.api.stats.timeout_count
     ),
 )
 
-SENSORS_GEN2: Final = (
-    IndevoltSensorEntityDescription(
-        key="1664",
-        name="DC Input Power1",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1665",
-        name="DC Input Power2",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1666",
-        name="DC Input Power3",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1667",
-        name="DC Input Power4",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1501",
-        name="Total DC Output Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="2108",
-        name="Total AC Output Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="1502",
-        name="Daily Production",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="1505",
-        name="Cumulative Production",
-        coefficient=0.001,
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="2101",
-        name="Total AC Input Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="2107",
-        name="Total AC Input Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="142",
-        name="Rated capacity",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6000",
-        name="Battery Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6009",
-        name="Battery SOC",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.BATTERY,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6105",
-        name="Emergency power supply",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.BATTERY,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="6004",
-        name="Battery Daily Charging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6005",
-        name="Battery Daily Discharging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6006",
-        name="Battery Total Charging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="6007",
-        name="Battery Total Discharging Energy",
-        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
-        device_class=SensorDeviceClass.ENERGY,
-        state_class=SensorStateClass.TOTAL_INCREASING
-    ),
-    IndevoltSensorEntityDescription(
-        key="11016",
-        name="Meter Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
-    ),
-    IndevoltSensorEntityDescription(
-        key="7101",
-        name="Working mode",
-        state_mapping={
-            1: "Self-consumed Prioritized",
-            5: "Charge/Discharge Schedule"
-        },
-        device_class=SensorDeviceClass.ENUM
-    ),
-    IndevoltSensorEntityDescription(
-        key="6001",
-        name="Battery Charge/Discharge State",
-        state_mapping={
-            1000: "Static",
-            1001: "Charging",
-            1002: "Discharging"
-        },
-        device_class=SensorDeviceClass.ENUM
-    ),
-    IndevoltSensorEntityDescription(
-        key="7120",
-        name="Meter Connection Status",
-        state_mapping={
-            1000: "ON",
-            1001: "OFF"
-        },
-        device_class=SensorDeviceClass.ENUM
-    ),
-    IndevoltSensorEntityDescription(
-        key="667",
-        name="Bypass Power",
-        native_unit_of_measurement=UnitOfPower.WATT,
-        device_class=SensorDeviceClass.POWER,
-        state_class=SensorStateClass.MEASUREMENT
+
+@dataclass(frozen=True, kw_only=True)
+class IndevoltEnergySensorEntityDescription(SensorEntityDescription):
+    """Entity description of energy integrated from a power register."""
+    power_key: str
+    counter_key: str
+    # Only integrate while this register holds this state, such as charging.
+    state_key: str | None = None
+    state: int | None = None
+    native_unit_of_measurement: str | None = UnitOfEnergy.KILO_WATT_HOUR
+    device_class: SensorDeviceClass | None = SensorDeviceClass.ENERGY
+    state_class: SensorStateClass | None = SensorStateClass.TOTAL_INCREASING
+    suggested_display_precision: int | None = 3
+
+
+ENERGY_SENSORS: Final = (
+    IndevoltEnergySensorEntityDescription(
+        key="integrated_production",
+        name="Integrated Production",
+        power_key="1501",
+        counter_key="1505"
+    ),
+    IndevoltEnergySensorEntityDescription(
+        key="integrated_ac_input_energy",
+        name="Integrated AC Input Energy",
+        power_key="2101",
+        counter_key="2107"
+    ),
+    IndevoltEnergySensorEntityDescription(
+        key="integrated_battery_charging_energy",
+        name="Integrated Battery Charging Energy",
+        power_key="6000",
+        counter_key="6006",
+        state_key="6001",
+        state=1001
+    ),
+    IndevoltEnergySensorEntityDescription(
+        key="integrated_battery_discharging_energy",
+        name="Integrated Battery Discharging Energy",
+        power_key="6000",
+        counter_key="6007",
+        state_key="6001",
+        state=1002
     ),
 )
 
 
+@dataclass(frozen=True, kw_only=True)
+class IndevoltAggregateSensorEntityDescription(SensorEntityDescription):
+    """Entity description of a rolling statistic of a register."""
+    source_key: str
+    window: int
+    statistic: str
+
+
+def aggregate_descriptions(description: IndevoltSensorEntityDescription) -> list[IndevoltAggregateSensorEntityDescription]:
+    """Return the rolling min/max/mean descriptions of a register, disabled by default."""
+    return [
+        IndevoltAggregateSensorEntityDescription(
+            key=f"{description.key}_{statistic}_{window}",
+            name=f"{description.name} {window // 60} min {statistic}",
+            source_key=description.key,
+            window=window,
+            statistic=statistic,
+            native_unit_of_measurement=description.native_unit_of_measurement,
+            device_class=description.device_class,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=0,
+            entity_registry_enabled_default=False,
+        )
+        for window in AGGREGATE_WINDOWS
+        for statistic in AGGREGATE_STATISTICS
+    ]
+
+
 async def async_setup_entry(hass, entry, async_add_entities):
     """
     Set up the sensor platform for Indevolt.
@@ -353,18 +191,41 @@ async def async_setup_entry(hass, entry, async_add_entities):
     It creates sensor entities for each defined sensor description.
     """
     coordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = []
-
-    # Create an entity for each sensor description.
-    if get_device_gen(coordinator.config_entry.data.get("device_model"))==1:
-        for description in SENSORS_GEN1:
-            entities.append(IndevoltSensorEntity(coordinator=coordinator, description=description))
-    else:
-        for description in SENSORS_GEN2:
-            entities.append(IndevoltSensorEntity(coordinator=coordinator, description=description))
+
+    # Create an entity for each sensor description of the device generation.
+    entities = [
+        IndevoltSensorEntity(coordinator=coordinator, description=description)
+        for description in coordinator.registers.values()
+    ]
+    entities.extend(
+        IndevoltDiagnosticSensorEntity(coordinator=coordinator, description=description)
+        for description in DIAGNOSTIC_SENSORS
+    )
+    entities.extend(
+        IndevoltEnergySensorEntity(coordinator=coordinator, description=coordinator.energy_sensors[key])
+        for key in coordinator.integrators
+    )
+    entities.extend(
+        IndevoltAggregateSensorEntity(coordinator=coordinator, description=description)
+        for key in coordinator.aggregates
+        for description in aggregate_descriptions(coordinator.registers[key])
+    )
     # Add all created entities to Home Assistant.
     async_add_entities(entities)
 
+def device_info(coordinator) -> DeviceInfo:
+    """Return the device info shared by all entities of a device."""
+    sn=coordinator.config_entry.data.get("sn", "unknown")
+    model=coordinator.config_entry.data.get("device_model", "unknown")
+    return DeviceInfo(
+        identifiers={(DOMAIN, coordinator.config_entry.entry_id)},
+        manufacturer="INDEVOLT",
+        name=f"INDEVOLT {model}",
+        serial_number=sn,
+        model=model,
+        sw_version=coordinator.config_entry.data.get("fw_version", "unknown"),
+    )
+
 class IndevoltSensorEntity(CoordinatorEntity, SensorEntity):
     """Represents a sensor entity for Indevolt devices."""
 
@@ -376,29 +237,128 @@ class IndevoltSensorEntity(CoordinatorEntity, SensorEntity):
         self.entity_description = description
 
         sn=coordinator.config_entry.data.get("sn", "unknown")
-        model=coordinator.config_entry.data.get("device_model", "unknown")
         self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{description.key}"
-        
-        self._attr_device_info = DeviceInfo(
-            identifiers={(DOMAIN, coordinator.config_entry.entry_id)},
-            manufacturer="INDEVOLT",
-            name=f"INDEVOLT {model}",
-            serial_number=sn,
-            model=model,
-            sw_version=coordinator.config_entry.data.get("fw_version", "unknown"),
-        )
+        self._attr_device_info = device_info(coordinator)
+        # Slot of our register in the coordinator's decoded value table.
+        self._slot = coordinator.table.slots[description.key]
         if description.device_class == SensorDeviceClass.ENUM:
-            self._attr_options = list(set(description.state_mapping.values()))
+            self._attr_options = coordinator.table.options[self._slot]
+        self._last_available: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates and request polling of our register."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_register_key(self.entity_description.key))
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when our register changed or availability flipped."""
+        available = self.available
+        if available == self._last_available and self.entity_description.key not in self.coordinator.changed_keys:
+            return
+        self._last_available = available
+        super()._handle_coordinator_update()
+
+    @property
+    def native_value(self):
+        """Return the current value of the sensor in its native unit."""
+        return self.coordinator.values[self._slot]
+
+class IndevoltDiagnosticSensorEntity(CoordinatorEntity, SensorEntity):
+    """Represents a sensor reporting polling statistics of an Indevolt device."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, description: IndevoltDiagnosticSensorEntityDescription):
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        sn=coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info(coordinator)
+
+    @property
+    def available(self) -> bool:
+        """Stay available while polls fail, so error counters keep reporting."""
+        return True
 
     @property
     def native_value(self):
-        """Return the current value of the sensor in its native unit."""    
-        raw_value = self.coordinator.data.get(self.entity_description.key)
-        
-        if raw_value is None:
-            return None
-        
-        if self.entity_description.device_class==SensorDeviceClass.ENUM:
-            return self.entity_description.state_mapping.get(raw_value)
-
-        return raw_value * self.entity_description.coefficient
+        """Return the current value of the statistic."""
+        return self.entity_description.value_fn(self.coordinator)
+
+class IndevoltAggregateSensorEntity(CoordinatorEntity, SensorEntity):
+    """Represents the rolling minimum, maximum or mean of a register."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, description: IndevoltAggregateSensorEntityDescription):
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        sn=coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info(coordinator)
+        self._statistic = AGGREGATE_STATISTICS.index(description.statistic)
+        self._last_available: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to coordinator updates and request polling of the source register."""
+        await super().async_added_to_hass()
+        self.async_on_remove(self.coordinator.async_register_key(self.entity_description.source_key))
+        self._attr_native_value = self._compute()
+
+    def _compute(self) -> float | None:
+        description = self.entity_description
+        result = self.coordinator.aggregate(description.source_key, description.window)
+        return None if result is None else result[self._statistic]
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the statistic or availability changed."""
+        value = self._compute()
+        available = self.available
+        if value == self._attr_native_value and available == self._last_available:
+            return
+        self._attr_native_value = value
+        self._last_available = available
+        super()._handle_coordinator_update()
+
+class IndevoltEnergySensorEntity(CoordinatorEntity, RestoreSensor):
+    """Represents energy integrated from power samples between device counter readings."""
+
+    _attr_has_entity_name = True
+
+    def __init__(self, coordinator, description: IndevoltEnergySensorEntityDescription):
+        super().__init__(coordinator)
+        self.entity_description = description
+
+        sn=coordinator.config_entry.data.get("sn", "unknown")
+        self._attr_unique_id = f"{DOMAIN}_{sn}_{coordinator.config_entry.entry_id}_{description.key}"
+        self._attr_device_info = device_info(coordinator)
+        self._integrator = coordinator.integrators[description.key]
+        self._last_available: bool | None = None
+
+    async def async_added_to_hass(self) -> None:
+        """Restore the last total and request polling of the registers we integrate."""
+        await super().async_added_to_hass()
+        description = self.entity_description
+        for key in (description.power_key, description.counter_key, description.state_key):
+            if key is not None:
+                self.async_on_remove(self.coordinator.async_register_key(key))
+
+        last = await self.async_get_last_sensor_data()
+        if last is not None and isinstance(last.native_value, (int, float)):
+            self._integrator.restore(float(last.native_value))
+        self._attr_native_value = self._integrator.total
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the total or availability changed."""
+        value = self._integrator.total
+        available = self.available
+        if value == self._attr_native_value and available == self._last_available:
+            return
+        self._attr_native_value = value
+        self._last_available = available
+        super()._handle_coordinator_update()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+"""Compact store of the raw register values of a device."""
+
+import math
+from array import array
+from typing import Any, Dict, Iterator, Tuple
+
+from .decoders import RegisterTable
+
+# Fill value of empty slots, and sentinel for lookups of absent registers.
+_EMPTY = math.nan
+_ABSENT = object()
+
+
+class RegisterSnapshot:
+    """
+    Raw register values of one device, updated in place.
+    Numeric values live in a preallocated array at the slot the generation's
+    shared RegisterTable assigns to each register; anything else (such as the
+    serial number) is kept in a small side dict. Every update bumps the
+    generation counter.
+    """
+
+    __slots__ = ("table", "raw", "extra", "generation")
+
+    def __init__(self, table: RegisterTable):
+        self.table = table
+        self.raw = array("d", [_EMPTY]) * len(table.keys)
+        self.extra: Dict[str, Any] = {}
+        self.generation = 0
+
+    def update(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Store fetched values and return the changed keys with their previous value."""
+        self.generation += 1
+        slots = self.table.slots
+        raw = self.raw
+        changed: Dict[str, Any] = {}
+        for key, value in result.items():
+            slot = slots.get(key)
+            if slot is not None and value is None:
+                value = _EMPTY
+            if slot is None or not isinstance(value, (int, float)):
+                if self.extra.get(key) != value:
+                    changed[key] = self.extra.get(key)
+                    self.extra[key] = value
+                continue
+            previous = raw[slot]
+            if previous != value and not (math.isnan(previous) and math.isnan(value)):
+                changed[key] = None if math.isnan(previous) else previous
+                raw[slot] = value
+        return changed
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the raw value of a register."""
+        slot = self.table.slots.get(key)
+        if slot is not None:
+            value = self.raw[slot]
+            if not math.isnan(value):
+                return value
+        return self.extra.get(key, default)
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return self.get(key, _ABSENT) is not _ABSENT
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        """Iterate over the registers that have a value."""
+        for key, value in zip(self.table.keys, self.raw):
+            if not math.isnan(value):
+                yield key, value
+        yield from self.extra.items()
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the values as a plain dict."""
+        return dict(self.items())
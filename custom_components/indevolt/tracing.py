@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+"""
+Timing of polls, recorded while debug logging is enabled for the integration.
+
+A poll trace adds up the time spent in each phase of a poll and keeps the
+timings of each request it sent. The dedicated session of a device carries
+an aiohttp trace config, which splits the time on the wire into connect,
+send and wait; its callbacks return at once for requests of untraced polls.
+"""
+
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import aiohttp
+
+
+class PollTrace:
+    """Phase timings of one poll and of the requests it sent, in seconds."""
+
+    __slots__ = ("started", "phases", "requests", "duration")
+
+    def __init__(self) -> None:
+        self.started = time.time()
+        self.phases: Dict[str, float] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.duration: float | None = None
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Add time spent in a phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def add_request(
+        self,
+        timings: Dict[str, float],
+        done: float,
+        decoded: float | None = None,
+        keys: int | None = None,
+        error: str | None = None,
+    ) -> None:
+        """
+        Record a request from the marks its trace callbacks left in timings.
+        A mark is missing when the request failed before reaching it; a
+        failed request is recorded with its error instead of a key count.
+        """
+        marks = [
+            ("queue", "queued", "start"),
+            ("connect", "start", "connected"),
+            ("send", "connected", "sent"),
+            ("wait", "sent", "done"),
+        ]
+        timings = {**timings, "done": done}
+        request: Dict[str, Any] = {} if keys is None else {"keys": keys}
+        for phase, begin, end in marks:
+            if begin in timings and end in timings:
+                request[phase] = round(timings[end] - timings[begin], 6)
+                self.add(phase, timings[end] - timings[begin])
+        if decoded is not None:
+            request["decode"] = round(decoded - done, 6)
+            self.add("decode", decoded - done)
+        if error is not None:
+            request["error"] = error
+        self.requests.append(request)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "started": datetime.fromtimestamp(self.started, timezone.utc).isoformat(),
+            "duration": round(self.duration, 6) if self.duration is not None else None,
+            "phases": {phase: round(seconds, 6) for phase, seconds in self.phases.items()},
+            "requests": self.requests,
+        }
+
+
+def _mark(name: str):
+    """Return a trace callback that stores the time it was called at under name."""
+
+    async def callback(session, context, params) -> None:
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx[name] = time.monotonic()
+
+    return callback
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config marking when a request got its connection and sent its headers."""
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(_mark("start"))
+    config.on_connection_create_end.append(_mark("connected"))
+    config.on_connection_reuseconn.append(_mark("connected"))
+    config.on_request_headers_sent.append(_mark("sent"))
+    return config
@@ -0,0 +1,51 @@
+"""Fixtures shared by the tests of the indevolt integration."""
+
+import asyncio
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.indevolt.const import DOMAIN
+from custom_components.indevolt.coordinator import IndevoltCoordinator
+from simulator import SimulatorFleet
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    yield
+
+
+@pytest.fixture
+async def fleet(socket_enabled):
+    """Simulated devices on 127.0.0.1, stopped after the test."""
+    fleet = SimulatorFleet()
+    yield fleet
+    await fleet.stop()
+
+
+def mock_entry(fleet: SimulatorFleet, index: int = 0, **data) -> MockConfigEntry:
+    """Return a config entry for a simulated device."""
+    device = fleet.devices[index]
+    return MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "host": "127.0.0.1",
+            "port": fleet.ports[index],
+            "sn": device.serial,
+            "device_model": "SolidFlex/PowerFlex2000" if device.config.gen == 2 else "BK1600/BK1600Ultra",
+            "device_gen": device.config.gen,
+            "streaming": False,
+            **data,
+        },
+    )
+
+
+async def async_setup(hass, entry: MockConfigEntry) -> IndevoltCoordinator:
+    """Set up a config entry and wait for the first poll, which runs in the background."""
+    entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    while coordinator.last_success_time is None:
+        await asyncio.sleep(0.01)
+    await hass.async_block_till_done()
+    return coordinator
@@ -0,0 +1,30 @@
+"""Tests of the hourly interpolation of counter gaps."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from custom_components.indevolt.backfill import interpolate_hours
+
+
+def at(hour: int, minute: int = 0) -> datetime:
+    """Return a time on a fixed day."""
+    return datetime(2024, 5, 1, hour, minute, tzinfo=timezone.utc)
+
+
+def test_hours_are_interpolated_between_readings():
+    """Every hour ending inside the gap gets the counter value at its end."""
+    hours = interpolate_hours(at(10, 30), 100, at(13, 30), 103)
+
+    assert [hour for hour, _ in hours] == [at(10), at(11), at(12)]
+    assert [value for _, value in hours] == pytest.approx([100.5, 101.5, 102.5])
+
+
+def test_gap_inside_one_hour():
+    """A gap that does not cross an hour boundary leaves nothing to backfill."""
+    assert interpolate_hours(at(10, 5), 100, at(10, 55), 101) == []
+
+
+def test_counter_going_down():
+    """A counter that went down, as after a reset, is not interpolated."""
+    assert interpolate_hours(at(10, 30), 100, at(13, 30), 50) == []
@@ -0,0 +1,179 @@
+"""Tests of batched reads against devices with a batch limit."""
+
+import pytest
+from aiohttp import web
+
+from custom_components.indevolt import indevolt_api
+from custom_components.indevolt.indevolt_api import (
+    BATCH_REPROBE_INTERVAL,
+    MAX_BATCH_SIZE,
+    PRIORITY_HIGH,
+    IndevoltAPI,
+    IndevoltAPIError,
+    IndevoltRequestRejected,
+)
+from custom_components.indevolt.register_map import load_register_map
+from simulator import SimulatorConfig
+
+KEYS = sorted(int(key) for key in load_register_map(2).descriptions)
+
+
+@pytest.fixture(autouse=True)
+def forget_batch_limits():
+    """Start every test without batch limits learned by an earlier one."""
+    indevolt_api._BATCH_LIMITS.clear()
+    yield
+    indevolt_api._BATCH_LIMITS.clear()
+
+
+async def poll(api: IndevoltAPI, device, keys, priorities=None):
+    """Read keys past the read cache and return the data and the number of requests."""
+    api.cache.clear()
+    served = device.requests
+    data = await api.fetch_batched(keys, priorities)
+    return data, device.requests - served
+
+
+def values(data):
+    """Return the keys read with a value."""
+    return {key for key, value in data.items() if value is not None}
+
+
+async def test_rejected_batches_settle_on_the_limit(fleet):
+    """A device rejecting more than 5 keys is read in batches of exactly 5."""
+    await fleet.start(1, SimulatorConfig(gen=2, max_batch_size=5))
+    device = fleet.devices[0]
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    try:
+        for _ in range(5):
+            data, _ = await poll(api, device, KEYS)
+            assert set(data) == {str(key) for key in KEYS}
+        data, requests = await poll(api, device, KEYS)
+    finally:
+        await api.async_close()
+
+    assert api.batch_size == 5
+    assert requests == -(-len(KEYS) // 5)
+    assert not api.unsupported
+
+
+async def test_truncated_batches_settle_on_the_limit(fleet):
+    """A device answering only the first 5 keys is read in batches of 5 from the next poll on."""
+    await fleet.start(1, SimulatorConfig(gen=2, max_batch_size=5, truncate=True))
+    device = fleet.devices[0]
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    try:
+        data, _ = await poll(api, device, KEYS)
+        assert set(data) == {str(key) for key in KEYS}
+        data, requests = await poll(api, device, KEYS)
+    finally:
+        await api.async_close()
+
+    assert api.batch_size == 5
+    assert requests == -(-len(KEYS) // 5)
+    assert set(data) == {str(key) for key in KEYS}
+    assert not api.unsupported
+
+
+async def test_unsupported_keys_keep_the_batch_size(fleet):
+    """Keys the firmware does not know are left out for a while without lowering the batch size."""
+    await fleet.start(1, SimulatorConfig(gen=2))
+    device = fleet.devices[0]
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    try:
+        data, _ = await poll(api, device, [*KEYS, 9998, 9999])
+        assert values(data) == {str(key) for key in KEYS}
+        # Unsupported keys come back without a value, so the last one read is dropped.
+        assert data["9998"] is None and data["9999"] is None
+        data, requests = await poll(api, device, [*KEYS, 9998, 9999])
+        assert requests == 1
+        # A group of nothing but unsupported keys is not mistaken for a size limit either.
+        assert values(await api.fetch_batched([9997, 9996])) == set()
+        assert set(api.unsupported) == {9996, 9997, 9998, 9999}
+        assert api.batch_size == MAX_BATCH_SIZE
+
+        # Once their time is up they are read again.
+        api.unsupported = dict.fromkeys(api.unsupported, 0.0)
+        data, _ = await poll(api, device, [*KEYS, 9998, 9999])
+        assert set(api.unsupported) == {9998, 9999}
+    finally:
+        await api.async_close()
+
+
+async def test_answer_without_requested_keys(socket_enabled):
+    """An answer holding none of the requested keys marks them unsupported instead of failing."""
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.json_response({"code": -1, "msg": "unknown key"})
+
+    app = web.Application()
+    app.router.add_post("/rpc/Indevolt.GetData", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    api = IndevoltAPI("127.0.0.1", runner.addresses[0][1])
+    try:
+        data = await api.fetch_batched([6000, 9999])
+    finally:
+        await api.async_close()
+        await runner.cleanup()
+
+    assert data == {"6000": None, "9999": None}
+    assert set(api.unsupported) == {6000, 9999}
+
+
+async def test_server_errors_keep_the_batch_size(fleet):
+    """A server error fails the poll without being taken for a batch that is too large."""
+    await fleet.start(1, SimulatorConfig(gen=2, error_rate=1.0))
+    device = fleet.devices[0]
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    try:
+        with pytest.raises(IndevoltAPIError) as err:
+            await poll(api, device, KEYS)
+        assert not isinstance(err.value, IndevoltRequestRejected)
+        device.config.error_rate = 0.0
+        _, requests = await poll(api, device, KEYS)
+    finally:
+        await api.async_close()
+
+    assert requests == 1
+    assert api.batch_size == MAX_BATCH_SIZE
+
+
+async def test_lowered_limit_is_probed_upwards_again(fleet):
+    """Some time after the limit was lowered, larger batches are tried again."""
+    await fleet.start(1, SimulatorConfig(gen=2, max_batch_size=5, truncate=True))
+    device = fleet.devices[0]
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    try:
+        await poll(api, device, KEYS)
+        assert api.batch_size == 5
+        device.config.max_batch_size = None
+        await poll(api, device, KEYS)
+        assert api.batch_size == 5
+
+        api.batch_limit.lowered_at -= BATCH_REPROBE_INTERVAL
+        for _ in range(5):
+            await poll(api, device, KEYS)
+        _, requests = await poll(api, device, KEYS)
+    finally:
+        await api.async_close()
+
+    assert requests == 1
+
+
+async def test_priorities_are_only_split_when_batches_wait(fleet):
+    """A high-priority key gets its own request only when the batches outnumber the free slots."""
+    await fleet.start(1, SimulatorConfig(gen=2, max_batch_size=5, truncate=True))
+    device = fleet.devices[0]
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0], max_concurrency=2)
+    priorities = {KEYS[-1]: PRIORITY_HIGH}
+    try:
+        await poll(api, device, KEYS)
+        _, requests = await poll(api, device, KEYS[-10:], priorities)
+        assert requests == 2
+        _, requests = await poll(api, device, KEYS, priorities)
+        assert requests == 1 + -(-(len(KEYS) - 1) // 5)
+    finally:
+        await api.async_close()
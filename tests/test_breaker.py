@@ -0,0 +1,42 @@
+"""Tests of the circuit breaker that suspends polling of unreachable devices."""
+
+from custom_components.indevolt import indevolt_api
+from custom_components.indevolt.indevolt_api import CircuitBreaker
+
+
+def test_breaker_opens_probes_and_closes(monkeypatch):
+    """The breaker opens at the threshold, allows a probe per interval and closes on success."""
+    now = 1000.0
+    monkeypatch.setattr(indevolt_api.time, "monotonic", lambda: now)
+    breaker = CircuitBreaker()
+
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    assert not breaker.is_open
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.probe_due()
+
+    now += CircuitBreaker.PROBE_INTERVAL
+    assert breaker.probe_due()
+    # A failed probe waits another interval before the next one.
+    breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.probe_due()
+
+    now += CircuitBreaker.PROBE_INTERVAL
+    assert breaker.probe_due()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.failures == 0
+
+
+def test_success_resets_the_failure_count():
+    """Failures only open the breaker when they follow each other."""
+    breaker = CircuitBreaker()
+    for _ in range(CircuitBreaker.FAILURE_THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert not breaker.is_open
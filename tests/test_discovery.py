@@ -0,0 +1,62 @@
+"""Tests of device identification."""
+
+import pytest
+from aiohttp import web
+
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from custom_components.indevolt import indevolt_api
+from custom_components.indevolt.discovery import async_identify, async_scan
+from custom_components.indevolt.indevolt_api import IndevoltAPI, IndevoltNotADevice
+from simulator import SimulatorConfig
+
+GENERATION_KEYS = {1: ["9999"], 2: ["142"]}
+
+
+async def test_identify_device(fleet):
+    """A device is identified by its serial number and the registers of its generation."""
+    await fleet.start(1, SimulatorConfig(gen=2))
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    try:
+        device = await async_identify(api, GENERATION_KEYS)
+    finally:
+        await api.async_close()
+
+    assert device.sn == str(fleet.devices[0].serial)
+    assert device.gen == 2
+    # Probing an address does not learn a batch limit for it.
+    assert api.base_url not in indevolt_api._BATCH_LIMITS
+
+
+async def test_scan_finds_device(hass, fleet):
+    """A scanned subnet yields the device on it and leaves no batch limits behind."""
+    await fleet.start(1, SimulatorConfig(gen=2))
+    limits = set(indevolt_api._BATCH_LIMITS)
+    devices = await async_scan(
+        async_get_clientsession(hass), "127.0.0.1/32", GENERATION_KEYS, port=fleet.ports[0]
+    )
+
+    assert [device.sn for device in devices] == [str(fleet.devices[0].serial)]
+    assert set(indevolt_api._BATCH_LIMITS) == limits
+
+
+async def test_json_without_serial_is_not_a_device(socket_enabled):
+    """Any other JSON service answering on the port is not taken for a device."""
+
+    async def handle(request: web.Request) -> web.Response:
+        return web.json_response({"status": "ok"})
+
+    app = web.Application()
+    app.router.add_post("/rpc/Indevolt.GetData", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+    api = IndevoltAPI("127.0.0.1", port)
+    try:
+        with pytest.raises(IndevoltNotADevice):
+            await async_identify(api, GENERATION_KEYS)
+    finally:
+        await api.async_close()
+        await runner.cleanup()
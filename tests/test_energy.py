@@ -0,0 +1,54 @@
+"""Tests of energy integrated from power samples."""
+
+import pytest
+
+from custom_components.indevolt.energy import MAX_SAMPLE_GAP, EnergyIntegrator
+
+# A tenth of an hour, so that 1000 W over one step is 0.1 kWh.
+STEP = 360
+
+
+def test_power_is_integrated_from_the_counter():
+    """Power samples advance the total from the last counter reading by the trapezoid rule."""
+    integrator = EnergyIntegrator()
+    integrator.add(1000, 0)
+    integrator.add(2000, STEP)
+    # Nothing is reported before the counter was read once.
+    assert integrator.total is None
+
+    integrator.reconcile(10)
+    integrator.add(2000, 2 * STEP)
+    assert integrator.total == pytest.approx(10.2)
+    integrator.add(0, 3 * STEP)
+    assert integrator.total == pytest.approx(10.3)
+
+
+def test_total_holds_until_the_counter_catches_up():
+    """A counter below the integrated total re-anchors it without lowering the total."""
+    integrator = EnergyIntegrator()
+    integrator.reconcile(10)
+    integrator.add(1000, 0)
+    integrator.add(1000, STEP)
+    assert integrator.total == pytest.approx(10.1)
+
+    integrator.reconcile(10.05)
+    assert integrator.total == pytest.approx(10.1)
+    integrator.add(1000, 1.25 * STEP)
+    assert integrator.total == pytest.approx(10.1)
+    integrator.add(1000, 2 * STEP)
+    assert integrator.total == pytest.approx(10.15)
+
+    integrator.reconcile(10.5)
+    assert integrator.total == 10.5
+
+
+def test_gaps_are_not_integrated():
+    """Samples further apart than MAX_SAMPLE_GAP add no energy."""
+    integrator = EnergyIntegrator()
+    integrator.reconcile(10)
+    integrator.add(1000, 0)
+    integrator.add(1000, MAX_SAMPLE_GAP + 1)
+    integrator.add(None, MAX_SAMPLE_GAP + 2)
+    integrator.add(1000, MAX_SAMPLE_GAP + 3)
+
+    assert integrator.total == 10
@@ -0,0 +1,87 @@
+"""Tests of the hub shared by all devices."""
+
+import asyncio
+import time
+
+import pytest
+
+from custom_components.indevolt.indevolt_api import PRIORITY_HIGH, PRIORITY_LOW, AdaptiveLimiter
+from custom_components.indevolt.hub import IndevoltHub
+
+
+async def request(limiter: AdaptiveLimiter, device, priority: int, duration: float, started: list) -> None:
+    """Hold a device slot and a hub slot like a request does, recording when it started."""
+    async with limiter.slot(priority), device.slot(priority):
+        started.append((priority, time.monotonic()))
+        await asyncio.sleep(duration)
+
+
+async def test_high_priority_read_is_not_held_up_by_slow_ones(hass):
+    """A meter read issued behind two slow requests uses the reserved slot through the hub."""
+    hub = IndevoltHub(hass)
+    device = hub.device_request_limiter()
+    limiter = AdaptiveLimiter(2)
+    started = []
+    begin = time.monotonic()
+    slow = [asyncio.create_task(request(limiter, device, PRIORITY_LOW, 1, started)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    await request(limiter, device, PRIORITY_HIGH, 0, started)
+    await asyncio.gather(*slow)
+
+    high = next(at for priority, at in started if priority == PRIORITY_HIGH)
+    assert high - begin < 0.5
+
+
+async def test_device_uses_its_configured_concurrency(hass):
+    """The hub does not cap a device below its own concurrency limit."""
+    hub = IndevoltHub(hass)
+    device = hub.device_request_limiter()
+    limiter = AdaptiveLimiter(8)
+    started = []
+    await asyncio.gather(*(request(limiter, device, PRIORITY_LOW, 0.2, started) for _ in range(8)))
+
+    assert max(at for _, at in started) - min(at for _, at in started) < 0.1
+
+
+async def test_offline_devices_cannot_take_every_slot(hass):
+    """With every shared slot held by hanging devices, another device still gets its own slot."""
+    hub = IndevoltHub(hass, max_requests=2)
+    offline, online = hub.device_request_limiter(), hub.device_request_limiter()
+    limiter = AdaptiveLimiter(8)
+    started = []
+    hanging = [asyncio.create_task(request(limiter, offline, PRIORITY_LOW, 10, started)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    try:
+        assert len(started) == 3
+
+        async def poll() -> None:
+            async with online.slot():
+                pass
+
+        await asyncio.wait_for(poll(), 1)
+    finally:
+        for task in hanging:
+            task.cancel()
+        await asyncio.gather(*hanging, return_exceptions=True)
+
+
+async def test_probe_takes_no_shared_slot(hass):
+    """A breaker probe waits for the device's own slot even while shared slots are free."""
+    hub = IndevoltHub(hass)
+    device = hub.device_request_limiter()
+    limiter = AdaptiveLimiter(2)
+    started = []
+    hanging = asyncio.create_task(request(limiter, device, PRIORITY_LOW, 10, started))
+    await asyncio.sleep(0.05)
+
+    async def probe() -> None:
+        async with device.slot(shared=False):
+            pass
+
+    try:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(probe(), 0.2)
+    finally:
+        hanging.cancel()
+        await asyncio.gather(hanging, return_exceptions=True)
+    await asyncio.wait_for(probe(), 1)
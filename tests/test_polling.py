@@ -0,0 +1,48 @@
+"""Tests of the keys the coordinator reads per poll."""
+
+import time
+from datetime import timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.indevolt.const import BACKFILL_KEYS
+from custom_components.indevolt.coordinator import BATTERY_STATE_KEY, DC_INPUT_KEYS
+from simulator import SimulatorConfig
+
+from .conftest import async_setup, mock_entry
+
+
+async def test_overrun_defers_counters_unless_closing_a_gap(hass, fleet):
+    """An overrunning poll defers low-priority counters, but not the one closing a gap."""
+    await fleet.start(1, SimulatorConfig(gen=2, latency=0.01))
+    entry = mock_entry(fleet)
+    coordinator = await async_setup(hass, entry)
+    tiers = list({description.poll_tier for description in coordinator.registers.values()})
+    counters = {int(key) for key in BACKFILL_KEYS if key in coordinator.registers}
+    assert counters
+
+    coordinator.poll_duration = 2 * coordinator.update_interval.total_seconds()
+    assert not counters & set(coordinator._due_keys(tiers, time.monotonic()))
+
+    coordinator._last_seen = dt_util.utcnow() - timedelta(hours=2)
+    assert counters <= set(coordinator._due_keys(tiers, time.monotonic()))
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_static_battery_backs_off_with_dc_input(hass, fleet):
+    """A static battery with DC input and steady power is polled less often than configured."""
+    await fleet.start(1, SimulatorConfig(gen=2))
+    entry = mock_entry(fleet, adaptive_interval=True, scan_interval=30, max_scan_interval=120)
+    coordinator = await async_setup(hass, entry)
+    coordinator.poll_duration = None
+    dc_input = {key: 200 for key in DC_INPUT_KEYS if key in coordinator.registers}
+    assert dc_input
+
+    coordinator.snapshot.update({BATTERY_STATE_KEY: 1000, **dc_input})
+    coordinator._adapt_interval({})
+    assert coordinator.update_interval == timedelta(seconds=75)
+
+    coordinator.snapshot.update({BATTERY_STATE_KEY: 1001})
+    coordinator._adapt_interval({})
+    assert coordinator.update_interval == timedelta(seconds=coordinator.min_scan_interval)
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,56 @@
+"""Tests of poll traces."""
+
+import pytest
+from aiohttp import web
+
+from custom_components.indevolt.indevolt_api import IndevoltAPI, IndevoltRequestRejected
+from custom_components.indevolt.tracing import PollTrace
+from simulator import SimulatorConfig
+
+
+async def test_failed_requests_are_traced(fleet):
+    """A failed request shows up in the trace with its error, a successful one with its key count."""
+    await fleet.start(1, SimulatorConfig(gen=2, max_batch_size=1))
+    api = IndevoltAPI("127.0.0.1", fleet.ports[0])
+    api.trace = PollTrace()
+    try:
+        assert await api.probe([0])
+        with pytest.raises(IndevoltRequestRejected):
+            await api.probe([0, 142])
+    finally:
+        await api.async_close()
+
+    succeeded, failed = api.trace.requests
+    assert succeeded["keys"] == 1
+    assert "error" not in succeeded
+    assert "keys" not in failed
+    assert "400" in failed["error"]
+    assert "wait" in failed
+
+
+async def test_traced_requests_reuse_the_device_connection(socket_enabled):
+    """Tracing a poll does not open connections of its own."""
+    peers = set()
+
+    async def handle(request: web.Request) -> web.Response:
+        peers.add(request.transport.get_extra_info("peername"))
+        return web.json_response({"0": "SN1"})
+
+    app = web.Application()
+    app.router.add_post("/rpc/Indevolt.GetData", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    api = IndevoltAPI("127.0.0.1", runner.addresses[0][1])
+    try:
+        await api.probe()
+        api.trace = PollTrace()
+        await api.probe()
+    finally:
+        await api.async_close()
+        await runner.cleanup()
+
+    assert len(peers) == 1
+    (request,) = api.trace.requests
+    assert {"connect", "send", "wait"} <= set(request)
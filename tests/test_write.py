@@ -0,0 +1,71 @@
+"""Tests of register writes through the coordinator."""
+
+import asyncio
+import dataclasses
+
+import pytest
+
+from simulator import SimulatorConfig
+
+from .conftest import async_setup, mock_entry
+
+
+def make_writable(coordinator, *keys: str) -> None:
+    """Give registers a write address, the simulator writing the read address itself."""
+    coordinator.registers = {
+        **coordinator.registers,
+        **{key: dataclasses.replace(coordinator.registers[key], write_key=key) for key in keys},
+    }
+
+
+async def test_write_during_flush(hass, fleet):
+    """A write arriving while another is in flight is sent by the next flush."""
+    await fleet.start(1, SimulatorConfig(gen=2, latency=0.3))
+    device = fleet.devices[0]
+    entry = mock_entry(fleet)
+    coordinator = await async_setup(hass, entry)
+    make_writable(coordinator, "7101", "6105")
+
+    first = hass.async_create_task(coordinator.async_write("7101", 5))
+    # The first flush starts after the debounce delay and is still waiting
+    # for the device when the second write arrives.
+    await asyncio.sleep(0.6)
+    second = hass.async_create_task(coordinator.async_write("6105", 40))
+    await asyncio.wait_for(asyncio.gather(first, second), 5)
+
+    assert device.writes == 2
+    assert device.values[7101] == 5
+    assert device.values[6105] == 40
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_writes_are_coalesced(hass, fleet):
+    """Writes within the debounce delay become one request, the last value winning."""
+    await fleet.start(1, SimulatorConfig(gen=2, latency=0.01))
+    device = fleet.devices[0]
+    entry = mock_entry(fleet)
+    coordinator = await async_setup(hass, entry)
+    make_writable(coordinator, "6105")
+
+    await asyncio.wait_for(
+        asyncio.gather(coordinator.async_write("6105", 30), coordinator.async_write("6105", 40)), 5
+    )
+
+    assert device.writes == 1
+    assert device.values[6105] == 40
+    assert coordinator.snapshot.get("6105") == 40
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_unverified_registers_are_read_only(hass, fleet):
+    """Registers without a verified write address get no entity and cannot be written."""
+    await fleet.start(1, SimulatorConfig(gen=2, latency=0.01))
+    entry = mock_entry(fleet)
+    coordinator = await async_setup(hass, entry)
+    await hass.async_block_till_done()
+
+    assert not hass.states.async_all(("number", "select"))
+    with pytest.raises(ValueError):
+        await coordinator.async_write("6105", 40)
+    assert fleet.devices[0].writes == 0
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,163 @@
+"""
+Polling benchmark for IndevoltCoordinator against the local simulator.
+
+Measures poll wall-time, requests per cycle, event-loop blocking and memory
+for fleets of simulated devices, without network access:
+
+    python tools/benchmark.py --devices 1 10 100 --cycles 5
+
+With --max-cycle-time or --max-requests the exit status is non-zero when a
+fleet exceeds the budget, so the script can guard against regressions in CI.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "custom_components"))
+
+from homeassistant.core import HomeAssistant  # noqa: E402
+from indevolt.coordinator import IndevoltCoordinator  # noqa: E402
+from indevolt.hub import IndevoltHub  # noqa: E402
+from indevolt.register_map import load_models, load_register_map  # noqa: E402
+from simulator import SimulatorConfig, SimulatorFleet  # noqa: E402
+
+
+@dataclass
+class BenchmarkResult:
+    """Measurements of one fleet size."""
+
+    devices: int
+    cycle_times: List[float]
+    requests_per_cycle: float
+    max_loop_block: float
+    peak_memory: int
+
+    @property
+    def median_cycle_time(self) -> float:
+        return statistics.median(self.cycle_times)
+
+
+class LoopMonitor:
+    """Measures how long the event loop is blocked between two ticks."""
+
+    INTERVAL = 0.005
+
+    def __init__(self) -> None:
+        self.max_block = 0.0
+        self._task: asyncio.Task | None = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.INTERVAL)
+            self.max_block = max(self.max_block, time.perf_counter() - start - self.INTERVAL)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+
+
+async def run_fleet(devices: int, cycles: int, simulator: SimulatorConfig) -> BenchmarkResult:
+    """Poll a fleet of simulated devices for a number of full cycles."""
+    fleet = SimulatorFleet()
+    await fleet.start(devices, simulator)
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        hub = IndevoltHub(hass)
+        model = next(model for model, gen in load_models().items() if gen == simulator.gen)
+        register_map = load_register_map(simulator.gen)
+        coordinators = [
+            IndevoltCoordinator(
+                hass, {"host": "127.0.0.1", "port": port, "device_model": model}, register_map, hub
+            )
+            for port in fleet.ports
+        ]
+
+        monitor = LoopMonitor()
+        monitor.start()
+        tracemalloc.start()
+        cycle_times = []
+        requests = []
+        try:
+            for _ in range(cycles):
+                # Cycles follow each other faster than the read cache expires.
+                for coordinator in coordinators:
+                    coordinator.api.cache.clear()
+                served = fleet.requests
+                start = time.perf_counter()
+                await asyncio.gather(*(coordinator.async_refresh() for coordinator in coordinators))
+                cycle_times.append(time.perf_counter() - start)
+                requests.append(fleet.requests - served)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+            monitor.stop()
+            for coordinator in coordinators:
+                await coordinator.async_shutdown()
+            await fleet.stop()
+            await hass.async_stop(force=True)
+
+    return BenchmarkResult(
+        devices=devices,
+        cycle_times=cycle_times,
+        requests_per_cycle=statistics.mean(requests),
+        max_loop_block=monitor.max_block,
+        peak_memory=peak_memory,
+    )
+
+
+async def _main(args: argparse.Namespace) -> int:
+    simulator = SimulatorConfig(
+        gen=args.gen,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        max_batch_size=args.max_batch_size,
+    )
+    failed = False
+    print(f"{'devices':>8} {'cycle ms':>10} {'req/cycle':>10} {'loop block ms':>14} {'peak KiB':>10}")
+    for devices in args.devices:
+        result = await run_fleet(devices, args.cycles, simulator)
+        print(
+            f"{result.devices:>8} {result.median_cycle_time * 1000:>10.1f} "
+            f"{result.requests_per_cycle:>10.1f} {result.max_loop_block * 1000:>14.1f} "
+            f"{result.peak_memory / 1024:>10.0f}"
+        )
+        if args.max_cycle_time is not None and result.median_cycle_time > args.max_cycle_time:
+            failed = True
+        if args.max_requests is not None and result.requests_per_cycle > args.max_requests * devices:
+            failed = True
+    return 1 if failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--gen", type=int, choices=(1, 2), default=2)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-batch-size", type=int, default=None)
+    parser.add_argument("--max-cycle-time", type=float, default=None, help="budget in seconds for the median cycle")
+    parser.add_argument("--max-requests", type=float, default=None, help="budget of requests per device and cycle")
+    sys.exit(asyncio.run(_main(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Local simulator of the Indevolt.GetData RPC endpoint.
+
+Serves gen1 and gen2 register maps with configurable latency, jitter, error
+rate and batch-size limit, accepts Indevolt.SetData writes, and optionally
+serves the /rpc event stream, for one or many simulated devices on 127.0.0.1.
+Run it standalone to point a development Home Assistant at it:
+
+    python tools/simulator.py --devices 3 --gen 2 --latency 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "custom_components"))
+
+from indevolt.register_map import load_register_map  # noqa: E402
+from homeassistant.components.sensor import SensorDeviceClass  # noqa: E402
+
+
+@dataclass
+class SimulatorConfig:
+    """Behaviour of one simulated device."""
+
+    gen: int = 2
+    # Seconds every request takes, plus a uniformly distributed jitter.
+    latency: float = 0.02
+    jitter: float = 0.0
+    # Share of requests answered with HTTP 500.
+    error_rate: float = 0.0
+    # Largest number of keys per request. Larger requests are rejected with
+    # HTTP 400, or truncated to the limit when truncate is set.
+    max_batch_size: int | None = None
+    truncate: bool = False
+    # Seconds between pushed notifications on the /rpc WebSocket, or None
+    # to refuse the WebSocket like firmware without an event stream.
+    stream_interval: float | None = None
+    seed: int | None = None
+
+
+@dataclass
+class SimulatedDevice:
+    """One simulated device and its request counters."""
+
+    config: SimulatorConfig
+    serial: str
+    values: Dict[int, Any] = field(default_factory=dict)
+    requests: int = 0
+    keys_served: int = 0
+    errors: int = 0
+    writes: int = 0
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.config.seed)
+        self._registers = load_register_map(self.config.gen).descriptions
+        for key, description in self._registers.items():
+            if description.device_class == SensorDeviceClass.ENUM:
+                self.values[int(key)] = next(iter(description.state_mapping))
+            elif description.device_class == SensorDeviceClass.POWER:
+                self.values[int(key)] = self._random.randint(0, 800)
+            else:
+                self.values[int(key)] = self._random.randint(0, 5000)
+        self.values[0] = self.serial
+
+    def read(self, keys: List[int]) -> Dict[str, Any]:
+        """Advance the simulated registers and return the requested ones."""
+        for key, description in self._registers.items():
+            if description.device_class == SensorDeviceClass.POWER:
+                self.values[int(key)] = max(0, self.values[int(key)] + self._random.randint(-50, 50))
+            elif description.state_class == "total_increasing":
+                self.values[int(key)] += self._random.randint(0, 2)
+        self.keys_served += len(keys)
+        return {str(key): self.values[key] for key in keys if key in self.values}
+
+    async def handle_get_data(self, request: web.Request) -> web.Response:
+        """Answer an Indevolt.GetData request."""
+        self.requests += 1
+        config = self.config
+        delay = config.latency + self._random.uniform(0, config.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if config.error_rate and self._random.random() < config.error_rate:
+            self.errors += 1
+            return web.Response(status=500, text="Internal error")
+
+        try:
+            keys = [int(key) for key in json.loads(request.query["config"])["t"]]
+        except (KeyError, TypeError, ValueError):
+            return web.Response(status=400, text="Invalid config")
+
+        if config.max_batch_size is not None and len(keys) > config.max_batch_size:
+            if not config.truncate:
+                return web.Response(status=400, text="Too many keys")
+            keys = keys[:config.max_batch_size]
+
+        return web.json_response(self.read(keys))
+
+    async def handle_set_data(self, request: web.Request) -> web.Response:
+        """Answer an Indevolt.SetData request writing consecutive registers."""
+        self.requests += 1
+        try:
+            config = json.loads(request.query["config"])
+            start = int(config["t"])
+            values = [int(value) for value in config["v"]]
+        except (KeyError, TypeError, ValueError):
+            return web.Response(status=400, text="Invalid config")
+        for offset, value in enumerate(values):
+            self.values[start + offset] = value
+        self.writes += 1
+        return web.json_response({"result": True})
+
+    async def handle_stream(self, request: web.Request) -> web.StreamResponse:
+        """Serve the JSON-RPC WebSocket and push the subscribed registers."""
+        if self.config.stream_interval is None:
+            return web.Response(status=404, text="Not found")
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        message = await ws.receive_json()
+        keys = [int(key) for key in message["params"]["t"]]
+        await ws.send_json({"id": message["id"], "result": self.read(keys)})
+        while not ws.closed:
+            await asyncio.sleep(self.config.stream_interval)
+            try:
+                await ws.send_json({"method": "NotifyStatus", "params": self.read(keys)})
+            except ConnectionResetError:
+                break
+        return ws
+
+
+class SimulatorFleet:
+    """Runs many simulated devices, each on its own port of 127.0.0.1."""
+
+    def __init__(self) -> None:
+        self.devices: List[SimulatedDevice] = []
+        self.ports: List[int] = []
+        self._runners: List[web.AppRunner] = []
+
+    async def start(self, count: int, config: SimulatorConfig) -> None:
+        """Start count devices sharing one configuration."""
+        for index in range(len(self.devices), len(self.devices) + count):
+            device_config = SimulatorConfig(**{**config.__dict__, "seed": index if config.seed is None else config.seed + index})
+            device = SimulatedDevice(device_config, serial=f"SIM{config.gen}{index:05d}")
+            app = web.Application()
+            app.router.add_post("/rpc/Indevolt.GetData", device.handle_get_data)
+            app.router.add_post("/rpc/Indevolt.SetData", device.handle_set_data)
+            app.router.add_get("/rpc", device.handle_stream)
+            runner = web.AppRunner(app, access_log=None)
+            await runner.setup()
+            site = web.TCPSite(runner, "127.0.0.1", 0)
+            await site.start()
+            self.devices.append(device)
+            self.ports.append(runner.addresses[0][1])
+            self._runners.append(runner)
+
+    @property
+    def requests(self) -> int:
+        """Return the number of requests served by all devices."""
+        return sum(device.requests for device in self.devices)
+
+    async def stop(self) -> None:
+        """Stop all devices."""
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+
+async def _main(args: argparse.Namespace) -> None:
+    fleet = SimulatorFleet()
+    await fleet.start(
+        args.devices,
+        SimulatorConfig(
+            gen=args.gen,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+            max_batch_size=args.max_batch_size,
+            truncate=args.truncate,
+            stream_interval=args.stream_interval,
+        ),
+    )
+    for device, port in zip(fleet.devices, fleet.ports):
+        print(f"{device.serial}: http://127.0.0.1:{port}/rpc/Indevolt.GetData")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fleet.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--devices", type=int, default=1)
+    parser.add_argument("--gen", type=int, choices=(1, 2), default=2)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-batch-size", type=int, default=None)
+    parser.add_argument("--truncate", action="store_true")
+    parser.add_argument("--stream-interval", type=float, default=None)
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()